@@ -1,28 +1,42 @@
 # Implementation of the A* search algorithm
-# The frontier is ordered so that the vertex with the lowest sum of cost and heuristic is explored next
+# The frontier is a priority queue ordered so that the vertex with the lowest sum of cost and heuristic is explored next
 # Takes in a graph, start vertex, goal vertex and heuristic function and finds a path from the start vertex to the goal vertex
 # The heuristic function must take (vertex, graph, start, goal) as its arguments
+# If it also has an estimates method, as a CachedHeuristic does, the children of each vertex are estimated together in one call
 # Returns the path and cost
+# multiAStarSearch searches from many sources at once towards many goals, estimating each vertex by its smallest heuristic over the goals
 
-from Graphs import Graph, loadGraph
+from Graphs import Graph, NoPathError, MultiSearchResult, loadGraph, reconstructPath
 from math import inf 
+from PriorityQueue import IndexedPriorityQueue
 
-def AStarSearch(graph, start, goal, heuristic, limit = inf):
+def AStarSearch(graph, start, goal, heuristic, limit = inf, stats = None):
+	"""
+	Given a graph, start node, goal node and heuristic function, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded, generated and reopened and the heuristic calls are recorded in it
+	"""
+
+	# frontier is a priority queue of vertices ordered by path cost + heuristic cost
+	# the path cost and heuristic cost of each vertex are stored alongside it
+	costs = {start : 0}
+	heuristics = {start : heuristic(start, graph, start, goal)}
+	frontier = IndexedPriorityQueue()
+	frontier.push(start, costs[start] + heuristics[start])
+	explored = set()
+	parents = {start : None}
+	batchHeuristic = getattr(heuristic, 'estimates', None)
 
-	# frontier is stored as tuples (vertex, path cost, heuristic cost)
-	frontier = [(start, 0, heuristic(start, graph, start, goal))]
-	explored = []
-	paths = {start : [start]}
+	if stats is not None:
+		stats.heuristicCalls += 1
 
 	while True:
 
 		if len(frontier) == 0:
-			raise Exception(f"No path from {start} to {goal}")
+			raise NoPathError(f"No path from {start} to {goal}")
 
-		# Sort the frontier into ascending order given the sum of path cost to a vertex and the heuristic function of that vertex
-		frontier.sort(key=lambda tup: tup[1] + tup[2])
-
-		vertex, cost, h = frontier.pop(0)
+		# Get the vertex with the lowest sum of path cost to a vertex and the heuristic function of that vertex
+		vertex, _ = frontier.pop()
+		cost, h = costs[vertex], heuristics[vertex]
 
 		# If the path cost + heuristic doesn't exceed the limit
 		if cost + h <= limit:
@@ -30,20 +44,151 @@ def AStarSearch(graph, start, goal, heuristic, limit = inf):
 			# If at the goal vertex return the path and cost
 			if vertex == goal:
 
-				return (paths[vertex], cost)
+				return (reconstructPath(parents, vertex), cost)
+
+			if stats is not None:
+				stats.expand(vertex)
+
+			children = graph.edgesOf(vertex)
+
+			# Estimate every child being added to the frontier for the first time in one call
+			if batchHeuristic is not None:
+
+				newChildren = [child for child in children if child != vertex and child not in explored and child not in frontier]
+				heuristics.update(zip(newChildren, batchHeuristic(newChildren, graph, start, goal)))
+
+				if stats is not None:
+					stats.heuristicCalls += len(newChildren)
 
 			# For each child vertex of the given vertex
-			for child in graph.edgesOf(vertex):
+			for child in children:
+
+				# If the edge isn't a loop and the child vertex hasn't been explored
+				if child != vertex and child not in explored:
+
+					newChildCost = cost + graph.edgeWeight(vertex, child)
+
+					# If the child is in the frontier check if there is a cheaper path to it
+					if child in frontier:
+
+						if newChildCost < costs[child]:
+
+							costs[child] = newChildCost
+							frontier.decreaseKey(child, newChildCost + heuristics[child])
+							parents[child] = vertex
+
+							if stats is not None:
+								stats.reopen(child, vertex)
+
+					else:
+
+						# Add the child vertex to the frontier and store it's parent
+						costs[child] = newChildCost
+
+						if batchHeuristic is None:
+							heuristics[child] = heuristic(child, graph, start, goal)
+							if stats is not None:
+								stats.heuristicCalls += 1
+
+						frontier.push(child, costs[child] + heuristics[child])
+						parents[child] = vertex
+
+						if stats is not None:
+							stats.generate(child, vertex, len(frontier))
+
+		# Add the vertex to the explored set
+		explored.add(vertex)
+
+def multiAStarSearch(graph, sources, goals, heuristic, stats = None):
+	"""
+	Given a graph, a list of sources, a list of goals and a heuristic function, this function returns the cheapest path from any source to any goal
+	as a MultiSearchResult of the path, its cost and the source and goal it joins
+	The heuristic of a vertex is the smallest over the goals, which is admissible if the heuristic is, the start it is given is the source the vertex was reached from
+	If a SearchStats is given the vertices expanded, generated and reopened and the heuristic calls are recorded in it
+	"""
+
+	goals = set(goals)
+
+	if len(goals) == 0:
+		raise Exception("At least one goal is needed")
+
+	def estimate(vertex, source):
+		return min(heuristic(vertex, graph, source, goal) for goal in goals)
+
+	# As in AStarSearch, along with the source each vertex was reached from
+	costs = {}
+	heuristics = {}
+	parents = {}
+	sources = list(sources)
+	roots = {}
+	frontier = IndexedPriorityQueue()
+
+	# Every source starts in the frontier with a path cost of 0
+	for source in sources:
+		if source not in frontier:
+			costs[source] = 0
+			heuristics[source] = estimate(source, source)
+			parents[source] = None
+			roots[source] = source
+			frontier.push(source, heuristics[source])
+
+			if stats is not None:
+				stats.heuristicCalls += len(goals)
+
+	explored = set()
+
+	while True:
+
+		if len(frontier) == 0:
+			raise NoPathError(f"No path from any of {sources} to any of {list(goals)}")
+
+		# Get the vertex with the lowest sum of path cost to a vertex and the heuristic function of that vertex
+		vertex, _ = frontier.pop()
+		cost = costs[vertex]
+
+		# The first goal explored is the cheapest to reach from any source
+		if vertex in goals:
+			return MultiSearchResult(reconstructPath(parents, vertex), cost, roots[vertex], vertex)
+
+		if stats is not None:
+			stats.expand(vertex)
+
+		# For each child vertex of the given vertex
+		for child in graph.edgesOf(vertex):
+
+			# If the edge isn't a loop and the child vertex hasn't been explored
+			if child != vertex and child not in explored:
+
+				newChildCost = cost + graph.edgeWeight(vertex, child)
+
+				# If the child is in the frontier check if there is a cheaper path to it
+				if child in frontier:
+
+					if newChildCost < costs[child]:
+
+						costs[child] = newChildCost
+						frontier.decreaseKey(child, newChildCost + heuristics[child])
+						parents[child] = vertex
+						roots[child] = roots[vertex]
+
+						if stats is not None:
+							stats.reopen(child, vertex)
+
+				else:
 
-				# If the edge isn't a loop and the child vertex hasn't been seen seen before 
-				if child != vertex and child not in [f[0] for f in frontier] and child not in explored:
+					# Add the child vertex to the frontier and store it's parent and source
+					costs[child] = newChildCost
+					heuristics[child] = estimate(child, roots[vertex])
+					frontier.push(child, costs[child] + heuristics[child])
+					parents[child] = vertex
+					roots[child] = roots[vertex]
 
-					# Append the child vertex to the frontier and store it's path 
-					frontier.append((child, cost + graph.edgeWeight(vertex, child), heuristic(child, graph, start, goal)))
-					paths[child] = paths[vertex] + [child]
+					if stats is not None:
+						stats.heuristicCalls += len(goals)
+						stats.generate(child, vertex, len(frontier))
 
-		# Add the vertex to the explored list
-		explored.append(vertex)
+		# Add the vertex to the explored set
+		explored.add(vertex)
 
 def heuristic(vertex, graph, start, goal):
 	"""
@@ -0,0 +1,181 @@
+# Bounded suboptimal and anytime variants of the A* search algorithm
+# Weighted A* orders the frontier by (cost + epsilon * heuristic), finding a path costing at most epsilon times the cheapest much sooner
+# Anytime repairing A* (ARA*) runs weighted A* with a decreasing epsilon, reusing the search of each run in the next
+# Each run only expands again the vertices whose cost improved since they were expanded, and yields a path at least as good as the last
+# along with a bound on how many times more it can cost than the cheapest path, until the bound reaches 1 and the path is optimal
+# The heuristic function must take (vertex, graph, start, goal) as its arguments, and be admissible for the bounds to hold
+# Returns the path and cost, or for ARA* yields (path, cost, bound) tuples
+
+from Graphs import Graph, NoPathError, loadGraph, reconstructPath
+from PriorityQueue import IndexedPriorityQueue
+from AStar import AStarSearch, heuristic
+from time import monotonic
+from math import inf
+
+class WeightedHeuristic():
+	"""A heuristic multiplied by epsilon, keeping the batched form of the heuristic if it has one"""
+
+	def __init__(self, heuristic, epsilon):
+		self.heuristic = heuristic
+		self.epsilon = epsilon
+
+		if hasattr(heuristic, 'estimates'):
+			self.estimates = lambda vertices, graph, start, goal: [self.epsilon * h for h in heuristic.estimates(vertices, graph, start, goal)]
+
+	def __call__(self, vertex, graph, start, goal):
+		return self.epsilon * self.heuristic(vertex, graph, start, goal)
+
+def weightedAStarSearch(graph, start, goal, heuristic, epsilon = 2, stats = None):
+	"""
+	Given a graph, start node, goal node and heuristic function, this function returns a path costing at most epsilon times the cheapest and its cost
+	If a SearchStats is given the vertices expanded, generated and reopened and the heuristic calls are recorded in it
+	"""
+
+	if epsilon < 1:
+		raise Exception("Epsilon must be at least 1")
+
+	return AStarSearch(graph, start, goal, WeightedHeuristic(heuristic, epsilon), stats = stats)
+
+def anytimeRepairingAStarSearch(graph, start, goal, heuristic, epsilon = 3, decrement = 0.5, timeLimit = None, maxExpansions = None, stats = None):
+	"""
+	Given a graph, start node, goal node and heuristic function, this generator yields (path, cost, bound) tuples
+	where the cheapest path costs at least cost / bound, each tuple being at least as good as the one before
+	The first path is found with the given epsilon, which is lowered by decrement after each path until it reaches 1
+	The search stops once the bound is 1, or early if timeLimit seconds pass or maxExpansions vertices are expanded,
+	possibly before any path is found, it can also be stopped at any time by no longer iterating over it
+	If a SearchStats is given the vertices expanded, generated and reopened and the heuristic calls are recorded in it,
+	with an iteration for each path yielded
+	"""
+
+	if epsilon < 1:
+		raise Exception("Epsilon must be at least 1")
+
+	if decrement <= 0:
+		raise Exception("Decrement must be positive")
+
+	deadline = monotonic() + timeLimit if timeLimit is not None else None
+	expansionsLeft = maxExpansions if maxExpansions is not None else inf
+
+	if start == goal:
+		yield [start], 0, 1
+		return
+
+	# The cheapest known cost to each vertex, the heuristic of each vertex and the parent it was reached from
+	costs = {start : 0}
+	heuristics = {start : heuristic(start, graph, start, goal)}
+	parents = {start : None}
+
+	frontier = IndexedPriorityQueue()
+	frontier.push(start, epsilon * heuristics[start])
+	explored = set()
+
+	# Explored vertices whose cost has improved since, expanded again in the next run
+	inconsistent = set()
+
+	if stats is not None:
+		stats.heuristicCalls += 1
+
+	def improvePath():
+		"""Expand vertices until the goal is cheaper than every vertex in the frontier, returning False if the search was stopped early"""
+
+		nonlocal expansionsLeft
+
+		while len(frontier) > 0 and costs.get(goal, inf) > frontier.peek()[1]:
+
+			if expansionsLeft <= 0 or (deadline is not None and monotonic() > deadline):
+				return False
+
+			vertex, _ = frontier.pop()
+			explored.add(vertex)
+			cost = costs[vertex]
+			expansionsLeft -= 1
+
+			if stats is not None:
+				stats.expand(vertex)
+
+			# For each child vertex of the given vertex
+			for child in graph.edgesOf(vertex):
+
+				newChildCost = cost + graph.edgeWeight(vertex, child)
+
+				# Only a cheaper path to the child changes anything
+				if newChildCost >= costs.get(child, inf):
+					continue
+
+				costs[child] = newChildCost
+				parents[child] = vertex
+
+				if child not in heuristics:
+					heuristics[child] = heuristic(child, graph, start, goal)
+					if stats is not None:
+						stats.heuristicCalls += 1
+
+				# Explored vertices wait for the next run, the others are added to or moved up the frontier
+				if child in explored:
+					inconsistent.add(child)
+					if stats is not None:
+						stats.reopen(child, vertex)
+
+				elif child in frontier:
+					frontier.decreaseKey(child, newChildCost + epsilon * heuristics[child])
+					if stats is not None:
+						stats.reopen(child, vertex)
+
+				else:
+					frontier.push(child, newChildCost + epsilon * heuristics[child])
+					if stats is not None:
+						stats.generate(child, vertex, len(frontier))
+
+		return True
+
+	while True:
+
+		expandedBefore = stats.nodesExpanded if stats is not None else 0
+		finished = improvePath()
+
+		if stats is not None:
+			stats.iterations += 1
+			stats.expandedPerIteration.append(stats.nodesExpanded - expandedBefore)
+
+		if not finished:
+			return
+
+		if goal not in costs:
+			raise NoPathError(f"No path from {start} to {goal}")
+
+		# No path can be cheaper than the smallest (cost + heuristic) of the vertices still to be expanded
+		lowest = min((costs[vertex] + heuristics[vertex] for vertex in frontier.positions.keys() | inconsistent), default = inf)
+		bound = max(1, min(epsilon, costs[goal] / lowest)) if lowest > 0 else epsilon
+
+		yield reconstructPath(parents, goal), costs[goal], bound
+
+		if bound <= 1:
+			return
+
+		# Lower epsilon and reorder the frontier, adding the inconsistent vertices to it
+		epsilon = max(1, epsilon - decrement)
+		vertices = list(frontier.positions.keys() | inconsistent)
+		frontier = IndexedPriorityQueue()
+		for vertex in vertices:
+			frontier.push(vertex, costs[vertex] + epsilon * heuristics[vertex])
+
+		inconsistent.clear()
+		explored.clear()
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
+	print("Initial epsilon?")
+	epsilon = float(input(""))
+	print("Time limit in seconds? enter 0 for no limit")
+	timeLimit = float(input(""))
+	if timeLimit == 0:
+		timeLimit = None
+
+	for path, cost, bound in anytimeRepairingAStarSearch(graph, start, goal, heuristic, epsilon, timeLimit = timeLimit):
+		print(path, cost, bound)
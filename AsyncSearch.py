@@ -0,0 +1,211 @@
+# Runs the searches from asyncio code without blocking the event loop
+# Each search runs in a worker thread and checks in every yieldEvery expansions, through the onExpand hook of a SearchStats:
+# it releases the interpreter so the event loop keeps running, and stops as soon as its query has been cancelled or passed its deadline
+# A SearchService coalesces identical queries, so concurrent callers asking for the same path on the same graph share one search,
+# which is only cancelled once every caller waiting for it has gone
+# Heavier engines can instead be run in worker processes through a QueryExecutor, whose searches can be abandoned but not interrupted
+# Any search function taking (graph, start, goal, *args) can be used, only those taking a stats argument can be interrupted
+
+from Graphs import Graph, loadGraph
+from SearchStats import SearchStats
+from ParallelQueries import QueryExecutor
+from ResultCache import copyResult
+from AStar import AStarSearch, heuristic
+from concurrent.futures import ThreadPoolExecutor
+from inspect import signature
+import threading
+import asyncio
+import time
+
+class SearchCancelled(Exception):
+	"""Raised inside a search running in a thread to stop it once its query has been cancelled"""
+
+def runInThread(searchFunction, graph, start, goal, args, cancelled, yieldEvery):
+	"""
+	Run a search, checking every yieldEvery expansions whether the cancelled event has been set
+	Searches without a stats argument run to completion
+	"""
+
+	if 'stats' not in signature(searchFunction).parameters:
+		return searchFunction(graph, start, goal, *args)
+
+	expansions = 0
+
+	def checkIn(vertex):
+
+		nonlocal expansions
+		expansions += 1
+
+		if expansions % yieldEvery == 0:
+
+			if cancelled.is_set():
+				raise SearchCancelled("The search was cancelled")
+
+			# Let the event loop thread run before carrying on
+			time.sleep(0)
+
+	return searchFunction(graph, start, goal, *args, stats = SearchStats(onExpand = checkIn))
+
+async def asyncSearch(searchFunction, graph, start, goal, *args, yieldEvery = 1000, timeout = None, threads = None):
+	"""
+	Run searchFunction(graph, start, goal, *args) without blocking the event loop, for example:
+		path, cost = await asyncSearch(AStarSearch, graph, start, goal, heuristic, timeout = 0.5)
+	If timeout seconds pass first asyncio.TimeoutError is raised, and the search stops, as it does if the awaiting task is cancelled
+	threads is the ThreadPoolExecutor to run the search in, by default the event loop's own
+	"""
+
+	loop = asyncio.get_running_loop()
+	cancelled = threading.Event()
+
+	try:
+		return await asyncio.wait_for(loop.run_in_executor(threads, runInThread, searchFunction, graph, start, goal, args, cancelled, yieldEvery), timeout)
+	except (asyncio.CancelledError, asyncio.TimeoutError):
+		cancelled.set()
+		raise
+
+class SearchService():
+
+	def __init__(self, graph, yieldEvery = 1000, threads = None, processes = 0):
+		"""
+		Creates a service answering queries on the graph
+		threads is the number of worker threads, by default chosen by ThreadPoolExecutor
+		If processes is more than 0 a pool of that many worker processes is started for searches offloaded to processes,
+		each holding the graph as it is now
+		The graph shouldn't be changed while searches are running in threads
+		"""
+
+		self.graph = graph
+		self.yieldEvery = yieldEvery
+		self.threads = ThreadPoolExecutor(threads)
+		self.processes = QueryExecutor(graph, processes) if processes > 0 else None
+
+		# The search and number of waiting callers of each query being answered
+		self.inFlight = {}
+
+		self.searches = 0
+		self.coalesced = 0
+
+	async def search(self, searchFunction, start, goal, *args, timeout = None, offload = "THREAD"):
+		"""
+		Answer searchFunction(graph, start, goal, *args), sharing the search with any identical query already in flight
+		offload is "THREAD" to search in a worker thread, or "PROCESS" to search in a worker process
+		If timeout seconds pass first asyncio.TimeoutError is raised
+		The search is stopped once every caller waiting for it has timed out or been cancelled
+		"""
+
+		if offload not in ["THREAD", "PROCESS"]:
+			raise Exception(f"Unknown offload {offload}")
+
+		if offload == "PROCESS" and self.processes is None:
+			raise Exception("The service was created without worker processes")
+
+		key = (searchFunction, start, goal, args, self.graph.version, offload)
+		entry = self.inFlight.get(key)
+
+		if entry is None:
+
+			task = asyncio.get_running_loop().create_task(self.run(searchFunction, start, goal, args, offload))
+			entry = self.inFlight[key] = [task, 0]
+			self.searches += 1
+
+			def finished(task):
+
+				# Later queries start a new search once this one has finished
+				if self.inFlight.get(key) is entry:
+					del self.inFlight[key]
+
+				# Retrieve the exception so it isn't reported as unhandled when every caller has already given up
+				if not task.cancelled():
+					task.exception()
+
+			task.add_done_callback(finished)
+
+		else:
+			self.coalesced += 1
+
+		task = entry[0]
+		entry[1] += 1
+
+		try:
+			# Shielded so that one caller giving up doesn't cancel the search for the others
+			result = await asyncio.wait_for(asyncio.shield(task), timeout)
+		finally:
+			entry[1] -= 1
+			if entry[1] == 0 and not task.done():
+
+				# Forget the search before cancelling it, so a caller arriving before it has stopped starts a new one rather than joining it
+				if self.inFlight.get(key) is entry:
+					del self.inFlight[key]
+
+				task.cancel()
+
+		# Each caller gets its own copy of the path
+		return copyResult(result)
+
+	async def run(self, searchFunction, start, goal, args, offload):
+		"""Run a single search in a worker thread or process"""
+
+		loop = asyncio.get_running_loop()
+
+		if offload == "PROCESS":
+
+			future = loop.create_future()
+
+			def finished(result):
+				if not future.done():
+					if isinstance(result, Exception):
+						future.set_exception(result)
+					else:
+						future.set_result(result)
+
+			# The result arrives on a thread of the pool, so hand it to the event loop
+			self.processes.submit(searchFunction, (start, goal) + args, lambda result: loop.call_soon_threadsafe(finished, result))
+			return await future
+
+		cancelled = threading.Event()
+
+		try:
+			return await loop.run_in_executor(self.threads, runInThread, searchFunction, self.graph, start, goal, args, cancelled, self.yieldEvery)
+		except asyncio.CancelledError:
+			cancelled.set()
+			raise
+
+	def close(self):
+		"""Stop the worker threads and processes, cancelling any searches still running"""
+
+		for task, _ in list(self.inFlight.values()):
+			task.cancel()
+
+		self.threads.shutdown(wait = False)
+		if self.processes is not None:
+			self.processes.close()
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, excType, excValue, traceback):
+		self.close()
+
+	def __str__(self):
+		return f"A search service with {len(self.inFlight)} searches in flight, {self.searches} run and {self.coalesced} coalesced"
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
+	print("Timeout in seconds?")
+	timeout = float(input(""))
+
+	async def main():
+
+		# Ask for the same path several times at once, only one search is run
+		async with SearchService(graph) as service:
+			results = await asyncio.gather(*[service.search(AStarSearch, start, goal, heuristic, timeout = timeout) for _ in range(4)], return_exceptions = True)
+			print(results[0])
+			print(service)
+
+	asyncio.run(main())
@@ -0,0 +1,168 @@
+# Non-interactive benchmark of every search algorithm over a matrix of randomly generated graphs
+# For each graph size and density it reports the median and 95th percentile latency, the mean number of vertices expanded,
+# the peak memory allocated during a search and how often the path cost agrees with uniform cost search (Dijkstra)
+# Results are saved as JSON so runs from different versions can be compared with --compare
+
+from Graphs import Graph, NoPathError
+from BreadthFirst import breadthFirstSearch
+from DepthFirst import depthFirstSearch
+from UniformCost import uniformCostSearch
+from AStar import AStarSearch
+from AnytimeAStar import weightedAStarSearch
+from GreedyBestFirst import greedyBestFirstSearch
+from Bidirectional import bidirectionalSearch
+from IterativeDeepeningDepthFirst import iterativeDeepeningDepthFirstSearch
+from IterativeDeepeningAStar import iterativeDeepeningAStarSearch
+from Landmarks import LandmarkHeuristic
+from SearchStats import SearchStats
+from time import perf_counter
+from math import ceil, isclose
+import statistics
+import tracemalloc
+import argparse
+import platform
+import random
+import json
+
+# The algorithms benchmarked, whether they take a heuristic and the largest graph they are run on
+# The iterative deepening searches take exponential time on dense graphs so they are limited to small ones
+ALGORITHMS = {
+	"BreadthFirst" : (breadthFirstSearch, False, None),
+	"DepthFirst" : (depthFirstSearch, False, None),
+	"UniformCost" : (uniformCostSearch, False, None),
+	"AStar" : (AStarSearch, True, None),
+	"WeightedAStar" : (weightedAStarSearch, True, None),
+	"GreedyBestFirst" : (greedyBestFirstSearch, True, None),
+	"Bidirectional" : (bidirectionalSearch, False, None),
+	"IterativeDeepeningDepthFirst" : (iterativeDeepeningDepthFirstSearch, False, 30),
+	"IterativeDeepeningAStar" : (iterativeDeepeningAStarSearch, True, 30),
+}
+
+def percentile(values, fraction):
+	"""The value below which the given fraction of the values fall"""
+
+	ordered = sorted(values)
+	return ordered[max(0, ceil(fraction * len(ordered)) - 1)]
+
+def runSearch(searchFunction, graph, start, goal, heuristic, stats = None):
+	"""Run one search, returning its cost or None if there is no path"""
+
+	try:
+		if heuristic is None:
+			return searchFunction(graph, start, goal, stats = stats)[1]
+		return searchFunction(graph, start, goal, heuristic, stats = stats)[1]
+	except NoPathError:
+		return None
+
+def benchmarkAlgorithm(searchFunction, graph, queries, references, heuristic):
+	"""Benchmark one algorithm over the queries, returning a dictionary of its results"""
+
+	# Time the searches without tracing memory, which would slow them down
+	latencies = []
+	costs = []
+	for start, goal in queries:
+		began = perf_counter()
+		costs.append(runSearch(searchFunction, graph, start, goal, heuristic))
+		latencies.append(perf_counter() - began)
+
+	# Repeat the searches to count expansions and trace memory
+	stats = SearchStats()
+	peakMemory = 0
+	for start, goal in queries:
+		tracemalloc.start()
+		runSearch(searchFunction, graph, start, goal, heuristic, stats)
+		peakMemory = max(peakMemory, tracemalloc.get_traced_memory()[1])
+		tracemalloc.stop()
+
+	agreements = sum(1 for cost, reference in zip(costs, references) if cost == reference or (cost is not None and reference is not None and isclose(cost, reference)))
+
+	return {
+		"queries" : len(queries),
+		"medianLatency" : statistics.median(latencies),
+		"p95Latency" : percentile(latencies, 0.95),
+		"meanExpanded" : stats.nodesExpanded / len(queries),
+		"meanGenerated" : stats.nodesGenerated / len(queries),
+		"peakFrontier" : stats.peakFrontier,
+		"peakMemory" : peakMemory,
+		"costAgreement" : agreements / len(queries),
+	}
+
+def runBenchmark(sizes, densities, noQueries, algorithms, noLandmarks = 8, seed = 0):
+	"""
+	Benchmark the named algorithms on a graph for every combination of size (number of vertices) and density (edges per vertex)
+	Returns a list of result dictionaries, one per graph and algorithm
+	"""
+
+	rng = random.Random(seed)
+	results = []
+
+	for noVertices in sizes:
+		for density in densities:
+
+			graph = Graph()
+			graph.randomlyGenerate(noVertices, min(noVertices ** 2, int(noVertices * density)), 1, 100, seed = rng.randrange(2 ** 32))
+			heuristic = LandmarkHeuristic.precompute(graph, min(noLandmarks, noVertices), seed = rng.randrange(2 ** 32))
+
+			queries = [(str(rng.randrange(noVertices)), str(rng.randrange(noVertices))) for _ in range(noQueries)]
+			references = [runSearch(uniformCostSearch, graph, start, goal, None) for start, goal in queries]
+
+			for name in algorithms:
+
+				searchFunction, usesHeuristic, maxVertices = ALGORITHMS[name]
+				result = {"algorithm" : name, "vertices" : noVertices, "edges" : graph.noEdges, "density" : density}
+
+				if maxVertices is not None and noVertices > maxVertices:
+					result["skipped"] = f"only run on graphs of up to {maxVertices} vertices"
+				else:
+					result.update(benchmarkAlgorithm(searchFunction, graph, queries, references, heuristic if usesHeuristic else None))
+
+				print(formatResult(result))
+				results.append(result)
+
+	return results
+
+def formatResult(result):
+	"""A single line summary of a result"""
+
+	summary = f"{result['algorithm']:<30}{result['vertices']:>8} vertices {result['edges']:>9} edges  "
+
+	if "skipped" in result:
+		return summary + "skipped"
+
+	return summary + (f"median {result['medianLatency'] * 1000:9.3f}ms  p95 {result['p95Latency'] * 1000:9.3f}ms  "
+					  f"expanded {result['meanExpanded']:10.1f}  peak {result['peakMemory'] / 1024:9.1f}KiB  agreement {result['costAgreement']:.2f}")
+
+def compareResults(previous, current):
+	"""Print the ratio of the current median latency to the previous one for each matching graph and algorithm"""
+
+	key = lambda result: (result["algorithm"], result["vertices"], result["density"])
+	before = {key(result) : result for result in previous if "skipped" not in result}
+
+	for result in current:
+		if "skipped" not in result and key(result) in before:
+			ratio = result["medianLatency"] / before[key(result)]["medianLatency"]
+			print(f"{result['algorithm']:<30}{result['vertices']:>8} vertices density {result['density']:<6} median latency x{ratio:.2f}")
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser(description = "Benchmark the search algorithms over randomly generated graphs")
+	parser.add_argument("--sizes", type = int, nargs = "+", default = [30, 300, 3000], help = "numbers of vertices")
+	parser.add_argument("--densities", type = float, nargs = "+", default = [2, 8], help = "edges per vertex")
+	parser.add_argument("--queries", type = int, default = 20, help = "queries per graph")
+	parser.add_argument("--algorithms", nargs = "+", default = list(ALGORITHMS.keys()), choices = list(ALGORITHMS.keys()))
+	parser.add_argument("--seed", type = int, default = 0)
+	parser.add_argument("--output", default = "benchmark.json", help = "file to save the results to")
+	parser.add_argument("--compare", help = "results file of a previous run to compare against")
+	arguments = parser.parse_args()
+
+	results = runBenchmark(arguments.sizes, arguments.densities, arguments.queries, arguments.algorithms, seed = arguments.seed)
+
+	with open(arguments.output, 'w') as fp:
+		json.dump({"python" : platform.python_version(),
+				   "platform" : platform.platform(),
+				   "parameters" : vars(arguments),
+				   "results" : results}, fp, indent = 1)
+
+	if arguments.compare is not None:
+		with open(arguments.compare, 'r') as fp:
+			compareResults(json.load(fp)["results"], results)
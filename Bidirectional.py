@@ -1,67 +1,94 @@
 # An implementation of the bidirectional search algorithm
 # Bidirectional search acts like two uniform cost searchs, one in each direction (goal -> start), (start -> goal)
+# The search from the goal follows the edges backwards, so the graph does not need to be bidirectional
+# Each step expands the direction whose frontier has the cheapest vertex
+# The search stops once the cheapest vertices of both frontiers together cost at least as much as the best path found
 # Takes in a graph, start vertex and goal vertex and finds a path from the start vertex to the goal vertex
 # Returns the path and cost
 
-from Graphs import Graph, loadGraph
+from Graphs import Graph, NoPathError, loadGraph, reconstructPath
+from PriorityQueue import IndexedPriorityQueue
+from math import inf
 
-def bidirectionalSearch(graph, start, goal):
+def bidirectionalSearch(graph, start, goal, stats = None):
+	"""
+	Given a graph, start node and goal node, this function returns the cheapest path and its cost
+	If a SearchStats is given the vertices expanded, generated and reopened in both directions are recorded in it
+	"""
 
-	# Check that the graph is bidirectional
-	if graph.bidirectional is False:
-		print("Graph must be bidirectional")
-		return None
+	if start == goal:
+		return [start], 0
 
-	frontier = {0 : [(start, 0)], 1 : [(goal, 0)]}
-	explored = {0 : [], 1 : []}
-	paths = {0 : {start : [start]}, 1 : {goal : [goal]}}
+	# Direction 0 searches forwards from the start, direction 1 searches backwards from the goal
+	frontier = {0 : IndexedPriorityQueue(), 1 : IndexedPriorityQueue()}
+	frontier[0].push(start, 0)
+	frontier[1].push(goal, 0)
+	explored = {0 : set(), 1 : set()}
+	costs = {0 : {start : 0}, 1 : {goal : 0}}
+	parents = {0 : {start : None}, 1 : {goal : None}}
 
-	# while the frontier is not empty, until the goal is reached
-	while True:
+	# The cheapest path found so far and the vertex where its two halves meet
+	best = inf
+	meeting = None
 
-		# For each direction
-		for i in [0, 1]:
+	# While neither frontier is empty
+	while len(frontier[0]) > 0 and len(frontier[1]) > 0:
 
-			# If either frontier is empty then failure
-			if len(frontier[0]) == 0 or len(frontier[1]) == 0:
-				raise Exception(f"No path exists between {start} and {goal}")
+		top = {i : frontier[i].peek()[1] for i in [0, 1]}
 
-			# Sort the current frontier by cost
-			frontier[i].sort(key=lambda tup: tup[1], reverse = False)
+		# No path through an unexplored vertex can be cheaper than the best one found
+		if top[0] + top[1] >= best:
+			break
 
-			# Get the next vertex to explore
-			vertex, cost = frontier[i].pop(0)
+		# Expand the direction with the cheapest vertex
+		i = 0 if top[0] <= top[1] else 1
+		vertex, cost = frontier[i].pop()
+		explored[i].add(vertex)
 
-			# If the vertex is in the opposing direction frontier
-			if vertex in [f[0] for f in frontier[(i + 1) % 2]]:
-				# Calculate and return the full path and cost 
-				return paths[0][vertex] + list(reversed(paths[1][vertex][:-1])), cost + dict(frontier[(i + 1) % 2])[vertex]
+		if stats is not None:
+			stats.expand(vertex)
 
-			# For each edge of the vertex
-			for child in graph.edgesOf(vertex):
+		children = graph.edgesOf(vertex) if i == 0 else graph.reverseEdgesOf(vertex)
 
-				# If the vertex has not yet been discovered
-				if child != vertex and child not in explored[i]:
+		# For each edge of the vertex, in the direction being searched
+		for child in children:
 
-					# If the child is in the frontier
-					if child in [f[0] for f in frontier[i]]:				
+			# If the vertex has not yet been explored and the edge is not a loop
+			if child != vertex and child not in explored[i]:
 
-						oldChildValue = dict(frontier[i])[child]
-						newChildValue = cost + graph.edgeWeight(vertex, child)
+				newChildValue = cost + (graph.edgeWeight(vertex, child) if i == 0 else graph.edgeWeight(child, vertex))
 
-						# If the new cost is less than the current cost
-						if newChildValue < oldChildValue:
+				# If the child is in the frontier check if there is a cheaper path to it
+				if child in frontier[i]:
 
-							frontier[i].remove((child, oldChildValue))
-							frontier[i].append((child, newChildValue))
+					if newChildValue >= frontier[i][child]:
+						continue
 
-					else:
+					frontier[i].decreaseKey(child, newChildValue)
 
-						# Add itself to the frontier and store its path
-						frontier[i].append((child, cost + graph.edgeWeight(vertex, child)))
-						paths[i][child] = paths[i][vertex] + [child]
+					if stats is not None:
+						stats.reopen(child, vertex)
 
-			explored[i].append(vertex)
+				else:
+
+					frontier[i].push(child, newChildValue)
+
+					if stats is not None:
+						stats.generate(child, vertex, len(frontier[0]) + len(frontier[1]))
+
+				costs[i][child] = newChildValue
+				parents[i][child] = vertex
+
+				# If the other direction has reached the child then check for a cheaper full path
+				if child in costs[1 - i] and newChildValue + costs[1 - i][child] < best:
+					best = newChildValue + costs[1 - i][child]
+					meeting = child
+
+	if meeting is None:
+		raise NoPathError(f"No path exists between {start} and {goal}")
+
+	# Join the path from the start to the meeting vertex with the path from the meeting vertex to the goal
+	return reconstructPath(parents[0], meeting) + list(reversed(reconstructPath(parents[1], meeting)))[1:], best
 
 if __name__ == '__main__':
 
@@ -2,73 +2,134 @@
 # BFS searches the shallowest nodes first, only moving deeper once all from a given depth have been explored
 # Takes in a graph, start vertex and goal vertex and finds a path from the start vertex to the goal vertex
 # Returns the path and cost
-
-from Graphs import Graph, loadGraph
-
-def breadthFirstSearch(graph, start, goal):
-	"""Given a graph, start node and goal node, this function returns a solution path and cost"""
-
-	frontier = [start]
-	explored = []
-	paths = {start : [start]}
-	solution = None
-
-	# While the frontier is not empty, until the goal is reached
-	while solution is None:
-
-		if len(frontier) == 0:
-			raise Exception(f"No path exists between {start} and {goal}")
+# multiBreadthFirstSearch searches from many sources at once and stops at the first goal discovered, the one fewest edges from any source
+
+from Graphs import Graph, NoPathError, MultiSearchResult, loadGraph, reconstructPath, pathCost
+from collections import deque
+
+def breadthFirstSearch(graph, start, goal, stats = None):
+	"""
+	Given a graph, start node and goal node, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	"""
+
+	parents = breadthFirstTree(graph, start, [goal], stats)
+
+	# The start vertex is never rediscovered, so a path from a vertex to itself is not found
+	if goal == start or goal not in parents:
+		raise NoPathError(f"No path exists between {start} and {goal}")
+
+	# Rebuild the path and calculate its cost
+	solution = reconstructPath(parents, goal)
+	return (solution, pathCost(graph, solution))
+
+def multiBreadthFirstSearch(graph, sources, goals, stats = None):
+	"""
+	Given a graph, a list of sources and a list of goals, this function returns the path with the fewest edges from any source to any goal
+	as a MultiSearchResult of the path, its cost and the source and goal it joins
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	"""
+
+	goals = set(goals)
+
+	# Every source starts in the frontier, a source that is also a goal needs no edges
+	frontier = deque()
+	discovered = set()
+	parents = {}
+	for source in sources:
+		if source in goals:
+			return MultiSearchResult([source], 0, source, source)
+		if source not in discovered:
+			frontier.append(source)
+			discovered.add(source)
+			parents[source] = None
+
+	# While the frontier is not empty, until a goal is reached
+	while len(frontier) > 0:
 
 		# Get the next vertex to explore
-		vertex = frontier.pop(0)
+		vertex = frontier.popleft()
+
+		if stats is not None:
+			stats.expand(vertex)
 
 		# For each edge of the vertex
 		for child in graph.edgesOf(vertex):
 
 			# If the vertex has not yet been discovered and the edge is not a loop
-			if child != vertex and child not in frontier and child not in explored:
+			if child != vertex and child not in discovered:
 
-				# If we have reached the goal vertex then break the loop
-				if child == goal:
+				parents[child] = vertex
 
-					solution = paths[vertex] + [child]
-								
-					# Calculate the cost of the path
-					cost = 0
-					for i in range(len(solution)-1):
-						cost += graph.edgeWeight(solution[i], solution[i+1])
+				if stats is not None:
+					stats.generate(child, vertex, len(frontier) + 1)
 
-					return (solution, cost)
+				# If we have reached a goal then rebuild the path and calculate its cost
+				if child in goals:
+					solution = reconstructPath(parents, child)
+					return MultiSearchResult(solution, pathCost(graph, solution), solution[0], child)
 
-				# Add itself to the frontier and store its path
+				# Add itself to the frontier
 				frontier.append(child)
-				paths[child] = paths[vertex] + [child]
+				discovered.add(child)
 
-		# Move the current vertex to explored
-		explored.append(vertex)
+	raise NoPathError(f"No path exists between any of {list(sources)} and any of {list(goals)}")
 
-if __name__ == '__main__':
-	
-	graph = loadGraph()
-
-	print("Start vertex?")
-	start = input("")
-	print("Goal vertex?")
-	goal = input("")
-
-	print(breadthFirstSearch(graph, start, goal))
+def breadthFirstTree(graph, start, goals = None, stats = None):
+	"""
+	Search outwards from the start vertex until every one of the goals has been discovered, or until the whole graph has if goals is None
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	Returns the parent pointers of the search tree, paths are rebuilt with reconstructPath
+	"""
 
+	frontier = deque([start])
+	# Every vertex that has been in the frontier, whether or not it has been explored yet
+	discovered = {start}
+	parents = {start : None}
+	remaining = set(goals) - {start} if goals is not None else None
 
+	if remaining is not None and len(remaining) == 0:
+		return parents
 
+	# While the frontier is not empty, until every goal is reached
+	while len(frontier) > 0:
 
+		# Get the next vertex to explore
+		vertex = frontier.popleft()
 
+		if stats is not None:
+			stats.expand(vertex)
 
+		# For each edge of the vertex
+		for child in graph.edgesOf(vertex):
 
+			# If the vertex has not yet been discovered and the edge is not a loop
+			if child != vertex and child not in discovered:
 
+				parents[child] = vertex
 
+				if stats is not None:
+					stats.generate(child, vertex, len(frontier) + 1)
 
+				# If we have reached the last goal vertex then stop searching
+				if remaining is not None:
+					remaining.discard(child)
+					if len(remaining) == 0:
+						return parents
 
+				# Add itself to the frontier
+				frontier.append(child)
+				discovered.add(child)
 
+	return parents
 
+if __name__ == '__main__':
+	
+	graph = loadGraph()
 
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
 
+	print(breadthFirstSearch(graph, start, goal))
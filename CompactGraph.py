@@ -0,0 +1,326 @@
+# A frozen, compressed sparse row (CSR) representation of a graph
+# Vertices are interned to integer ids, the edges of vertex i are stored in targets[offsets[i]:offsets[i+1]]
+# The weight of each edge is stored at the same position in weights
+# Optional coordinates are stored as consecutive (x, y) pairs in positions, with NaN for a vertex without coordinates
+# Exposes the same query methods as Graphs.Graph so every search module works unchanged
+
+from array import array
+from math import isnan, nan
+import json
+
+# Rows of more edges than this are looked up in edgeWeight through a dictionary rather than scanned
+INDEXED_DEGREE = 16
+
+def loadCompactGraph(filePath):
+	"""Load a graph stored in the JSON format read by Graphs.loadGraph straight into a CompactGraph"""
+
+	with open(filePath, 'r') as fp:
+		return CompactGraph.fromDict(*splitJSONGraph(json.load(fp)))
+
+def splitJSONGraph(data):
+	"""
+	Split a graph read from JSON into its graph dictionary and coordinates, which are None if it has none
+	A graph is either stored as just its graph dictionary, or with coordinates as:
+		{'graph' : {'a' : {'b' : 10}, 'b' : {}},
+		 'coordinates' : {'a' : [0.0, 1.5], 'b' : [2.0, 0.5]}}
+	Edge weights are never lists, so this can't be mistaken for a graph dictionary
+	"""
+
+	coordinates = data.get('coordinates')
+
+	if data.keys() == {'graph', 'coordinates'} and isinstance(coordinates, dict) and len(coordinates) > 0 and all(isinstance(point, list) for point in coordinates.values()):
+		return data['graph'], coordinates
+
+	return data, None
+
+class CompactGraph():
+
+	def __init__(self, names, offsets, targets, weights, bidirectional = None, positions = None):
+		"""
+		Creates a new compact graph from already built buffers
+		names is the list of vertex names, the position of a name is its vertex id
+		offsets has noVertices + 1 entries, targets and weights have one entry per edge
+		positions is optional and has 2 * noVertices entries, the coordinates of vertex i being (positions[2*i], positions[2*i+1])
+		The buffers can be arrays or memoryviews, for example of a memory mapped file
+		If whether the graph is bidirectional is already known it can be given to skip testing it
+		Use fromGraph, fromDict or loadCompactGraph rather than calling this directly
+		"""
+
+		if len(offsets) != len(names) + 1:
+			raise Exception("There must be exactly one more offset than vertices")
+
+		if len(targets) != len(weights) or offsets[-1] != len(targets):
+			raise Exception("Offsets, targets and weights do not describe the same edges")
+
+		if positions is not None and len(positions) != 2 * len(names):
+			raise Exception("There must be exactly two positions per vertex")
+
+		self.names = names
+		self.ids = {name : i for i, name in enumerate(names)}
+		self.offsets = offsets
+		self.targets = targets
+		self.weights = weights
+		self.weightType = weights.typecode if isinstance(weights, array) else weights.format
+		self.positions = positions
+
+		# A compact graph never changes, so it always has the version it was built with
+		self.version = 0
+
+		# The reverse buffers, holding the edges into each vertex, are only built when first needed
+		self.reverseOffsets = None
+		self.sources = None
+		self.reverseWeights = None
+
+		# The dictionaries of target id to weight of the long rows whose edge weights have been looked up
+		self.rowIndexes = {}
+
+		if bidirectional is None:
+			self.testBidirectional()
+		else:
+			self.bidirectional = bidirectional
+
+	@classmethod
+	def fromDict(cls, graphDict, coordinates = None):
+		"""
+		Build a compact graph from a graph dictionary of type:
+			{'a' : {'b' : 10, 'c' : 5},
+			 'b' : {'a' : 10},
+			 'c' : {'a' : 5}}
+		and optionally a dictionary of coordinates of type:
+			{'a' : (0.0, 1.5), 'b' : (2.0, 0.5), 'c' : (1.0, 1.0)}
+		"""
+
+		names = list(graphDict.keys())
+		ids = {name : i for i, name in enumerate(names)}
+
+		# Keep integer weights exact, otherwise store them as doubles
+		integral = all(type(w) is int for edgeDict in graphDict.values() for w in edgeDict.values())
+
+		offsets = array('q', [0])
+		targets = array('q')
+		weights = array('q' if integral else 'd')
+
+		for name in names:
+			for edge, weight in graphDict[name].items():
+
+				if edge not in ids:
+					raise Exception(f"Edge destination {edge} not in graph")
+
+				targets.append(ids[edge])
+				weights.append(weight)
+
+			offsets.append(len(targets))
+
+		positions = None
+
+		if coordinates:
+			positions = array('d')
+			for name in names:
+				positions.extend(coordinates.get(name, (nan, nan)))
+
+		return cls(names, offsets, targets, weights, positions = positions)
+
+	@classmethod
+	def fromGraph(cls, graph):
+		"""Build a compact graph from an existing Graphs.Graph"""
+		return cls.fromDict(graph.graphDict, graph.coordinates)
+
+	def testBidirectional(self):
+		"""Tests whether the graph is bidirectional, returns True or False"""
+
+		self.bidirectional = True
+
+		for i in range(len(self.names)):
+			for target in self.targets[self.offsets[i]:self.offsets[i+1]]:
+
+				# If opposite direction edge doesn't exist set bidirectional to false
+				if i not in self.targets[self.offsets[target]:self.offsets[target+1]]:
+					self.bidirectional = False
+					return self.bidirectional
+
+		return self.bidirectional
+
+	def idOf(self, vertex):
+		"""Get the integer id of a vertex name"""
+
+		try:
+			return self.ids[vertex]
+		except KeyError:
+			raise Exception("No such vertex")
+
+	def nameOf(self, i):
+		"""Get the vertex name of an integer id"""
+		return self.names[i]
+
+	def neighbourIds(self, i):
+		"""Get the ids of the destinations of the edges leaving the vertex with id i"""
+		return self.targets[self.offsets[i]:self.offsets[i+1]]
+
+	def neighbourWeights(self, i):
+		"""Get the weights of the edges leaving the vertex with id i, in the same order as neighbourIds"""
+		return self.weights[self.offsets[i]:self.offsets[i+1]]
+
+	def buildReverse(self):
+		"""Build the CSR buffers of the edges into each vertex with a counting sort over the targets"""
+
+		noVertices = len(self.names)
+		reverseOffsets = array('q', bytes(8 * (noVertices + 1)))
+
+		for target in self.targets:
+			reverseOffsets[target + 1] += 1
+		for i in range(noVertices):
+			reverseOffsets[i + 1] += reverseOffsets[i]
+
+		sources = array('q', bytes(8 * len(self.targets)))
+		reverseWeights = array(self.weightType, bytes(self.weights.itemsize * len(self.weights)))
+		nextSlot = array('q', reverseOffsets[:-1])
+
+		for i in range(noVertices):
+			for k in range(self.offsets[i], self.offsets[i+1]):
+				target = self.targets[k]
+				sources[nextSlot[target]] = i
+				reverseWeights[nextSlot[target]] = self.weights[k]
+				nextSlot[target] += 1
+
+		self.reverseOffsets = reverseOffsets
+		self.sources = sources
+		self.reverseWeights = reverseWeights
+
+	def reverseNeighbourIds(self, i):
+		"""Get the ids of the sources of the edges entering the vertex with id i"""
+
+		if self.reverseOffsets is None:
+			self.buildReverse()
+
+		return self.sources[self.reverseOffsets[i]:self.reverseOffsets[i+1]]
+
+	def reverseNeighbourWeights(self, i):
+		"""Get the weights of the edges entering the vertex with id i, in the same order as reverseNeighbourIds"""
+
+		if self.reverseOffsets is None:
+			self.buildReverse()
+
+		return self.reverseWeights[self.reverseOffsets[i]:self.reverseOffsets[i+1]]
+
+	@property
+	def vertices(self):
+		"""Return a list of the vertices"""
+		return list(self.names)
+
+	@property
+	def edges(self):
+		"""Return a list of the edges as (vertex, edge) tuples"""
+		return [(self.names[i], self.names[t]) for i in range(len(self.names)) for t in self.neighbourIds(i)]
+
+	@property
+	def totalWeight(self):
+		"""The total weight of all the edges in the graph"""
+		return sum(self.weights)
+
+	def degreeOf(self, vertex, inOutBoth = "BOTH"):
+		"""
+		Get the degree of a vertex
+		inOutBoth specifies whether to assess just edges into or out of a vertex, or both
+		"""
+
+		i = self.idOf(vertex)
+
+		if inOutBoth == "OUT":
+			return self.offsets[i+1] - self.offsets[i]
+
+		elif inOutBoth == "IN":
+			return len(self.reverseNeighbourIds(i))
+
+		elif inOutBoth == "BOTH":
+			if self.bidirectional: return self.degreeOf(vertex, "OUT")
+			else: return self.degreeOf(vertex, "OUT") + self.degreeOf(vertex, "IN")
+
+	def edgeWeight(self, vertex, edge):
+		"""Get the weight of an edge from vertex to edge"""
+
+		i = self.idOf(vertex)
+		j = self.idOf(edge)
+
+		start, end = self.offsets[i], self.offsets[i+1]
+
+		# Short rows are scanned, rows are as long as the vertex degree
+		if end - start <= INDEXED_DEGREE:
+			for k in range(start, end):
+				if self.targets[k] == j:
+					return self.weights[k]
+
+		# Longer rows are indexed by target id the first time one of their edges is looked up,
+		# otherwise a search checking the weight of each edge of a vertex would take time quadratic in its degree
+		else:
+			row = self.rowIndexes.get(i)
+			if row is None:
+				row = self.rowIndexes[i] = dict(zip(self.targets[start:end], self.weights[start:end]))
+			if j in row:
+				return row[j]
+
+		raise Exception("No such edge")
+
+	def coordinatesOf(self, vertex):
+		"""Get the coordinates of a vertex"""
+
+		i = self.idOf(vertex)
+
+		if self.positions is None or isnan(self.positions[2 * i]):
+			raise Exception("No coordinates for vertex")
+
+		return (self.positions[2 * i], self.positions[2 * i + 1])
+
+	@property
+	def coordinates(self):
+		"""Return a dictionary of the coordinates of each vertex that has them"""
+
+		if self.positions is None:
+			return {}
+
+		positions = self.positions
+		return {name : (positions[2 * i], positions[2 * i + 1]) for i, name in enumerate(self.names) if not isnan(positions[2 * i])}
+
+	@property
+	def hasCoordinates(self):
+		"""Whether every vertex has coordinates"""
+		return len(self.names) > 0 and self.positions is not None and not any(isnan(self.positions[2 * i]) for i in range(len(self.names)))
+
+	def edgesOf(self, vertex):
+		"""Get a list of all the destinations of the edges leaving a vertex"""
+
+		names = self.names
+		return [names[t] for t in self.neighbourIds(self.idOf(vertex))]
+
+	def reverseEdgesOf(self, vertex):
+		"""Get a list of all the sources of the edges entering a vertex"""
+
+		names = self.names
+		return [names[s] for s in self.reverseNeighbourIds(self.idOf(vertex))]
+
+	def sortedEdgesOf(self, vertex):
+		"""Get a list of all the destinations of the edges leaving a vertex, ordered by ascending edge weight"""
+
+		i = self.idOf(vertex)
+		row = sorted(zip(self.neighbourWeights(i), range(self.offsets[i+1] - self.offsets[i])))
+		targets = self.neighbourIds(i)
+		return [self.names[targets[k]] for _, k in row]
+
+	@property
+	def noVertices(self):
+		"""The number of vertices in the graph"""
+		return len(self.names)
+
+	@property
+	def noEdges(self):
+		"""
+		The number of edges in the graph
+		Bidirectional edges will be counted twice
+		"""
+		return len(self.targets)
+
+	def toDict(self):
+		"""Expand the compact graph back into a graph dictionary usable by Graphs.Graph"""
+		return {self.names[i] : {self.names[t] : w for t, w in zip(self.neighbourIds(i), self.neighbourWeights(i))} for i in range(len(self.names))}
+
+	def __str__(self):
+		return f"A compact graph with {self.noVertices} vertices and {self.noEdges} edges"
@@ -0,0 +1,254 @@
+# Contraction Hierarchies (CH) preprocessing and query engine for static graphs
+# Vertices are contracted one at a time, least important first, where importance is the edge difference:
+# the number of shortcuts contracting the vertex would add minus the number of edges it would remove
+# When a vertex is contracted a shortcut is added between each pair of its neighbours unless a witness search finds a path at least as cheap that avoids it
+# A query is a bidirectional uniform cost search that only follows edges towards vertices contracted later
+# Shortcuts in the path found are then unpacked back into the original edges
+# Returns the same (path, cost) as uniformCostSearch
+
+from Graphs import Graph, NoPathError, loadGraph, reconstructPath
+from PriorityQueue import IndexedPriorityQueue
+from math import inf
+import json
+
+class ContractionHierarchy():
+
+	def __init__(self, ranks, upward, downward, middles):
+		"""
+		Creates a hierarchy from already computed parts
+		ranks is the order in which each vertex was contracted
+		upward[v] holds the edges (including shortcuts) leaving v towards vertices with a higher rank, as {w : weight}
+		downward[v] holds the edges (including shortcuts) entering v from vertices with a higher rank, as {u : weight}
+		middles maps each shortcut (u, w) to the contracted vertex it bypasses
+		Use preprocess or load rather than calling this directly
+		"""
+
+		self.ranks = ranks
+		self.upward = upward
+		self.downward = downward
+		self.middles = middles
+
+	@classmethod
+	def preprocess(cls, graph, witnessLimit = 500):
+		"""
+		Contract every vertex of the graph and return the hierarchy
+		witnessLimit bounds the number of vertices each witness search may explore, lower values preprocess faster but add more shortcuts
+		"""
+
+		# Copies of the edges between the vertices that haven't been contracted yet, loops are never part of a shortest path
+		outEdges = {vertex : {} for vertex in graph.vertices}
+		inEdges = {vertex : {} for vertex in graph.vertices}
+		for vertex in graph.vertices:
+			for edge in graph.edgesOf(vertex):
+				if edge != vertex:
+					outEdges[vertex][edge] = graph.edgeWeight(vertex, edge)
+					inEdges[edge][vertex] = outEdges[vertex][edge]
+
+		ranks = {}
+		upward = {vertex : {} for vertex in graph.vertices}
+		downward = {vertex : {} for vertex in graph.vertices}
+		middles = {}
+		contractedNeighbours = {vertex : 0 for vertex in graph.vertices}
+
+		def importanceOf(vertex, shortcuts):
+			return len(shortcuts) - len(outEdges[vertex]) - len(inEdges[vertex]) + contractedNeighbours[vertex]
+
+		order = IndexedPriorityQueue()
+		for vertex in graph.vertices:
+			order.push(vertex, importanceOf(vertex, cls.shortcutsFor(vertex, outEdges, inEdges, witnessLimit)))
+
+		while len(order) > 0:
+
+			vertex, _ = order.pop()
+			shortcuts = cls.shortcutsFor(vertex, outEdges, inEdges, witnessLimit)
+
+			# Importances are updated lazily, if this one has grown past the next vertex then put it back
+			importance = importanceOf(vertex, shortcuts)
+			if len(order) > 0 and importance > order.peek()[1]:
+				order.push(vertex, importance)
+				continue
+
+			ranks[vertex] = len(ranks)
+
+			# The remaining edges of the vertex all lead to vertices contracted later
+			upward[vertex] = dict(outEdges[vertex])
+			downward[vertex] = dict(inEdges[vertex])
+
+			for u, w, weight in shortcuts:
+				if weight < outEdges[u].get(w, inf):
+					outEdges[u][w] = weight
+					inEdges[w][u] = weight
+					middles[(u, w)] = vertex
+
+			# Remove the vertex from the remaining graph
+			for w in outEdges[vertex]:
+				del inEdges[w][vertex]
+				contractedNeighbours[w] += 1
+			for u in inEdges[vertex]:
+				del outEdges[u][vertex]
+				contractedNeighbours[u] += 1
+			outEdges[vertex] = {}
+			inEdges[vertex] = {}
+
+		return cls(ranks, upward, downward, middles)
+
+	@staticmethod
+	def shortcutsFor(vertex, outEdges, inEdges, witnessLimit):
+		"""
+		Find the shortcuts needed to contract a vertex from the remaining graph, as (u, w, weight) tuples
+		A shortcut from u to w is needed unless a witness path avoiding the vertex costs no more than going through it
+		"""
+
+		shortcuts = []
+
+		for u, inWeight in inEdges[vertex].items():
+
+			targets = {w : inWeight + outWeight for w, outWeight in outEdges[vertex].items() if w != u}
+			if len(targets) == 0:
+				continue
+
+			costs = ContractionHierarchy.witnessSearch(u, vertex, max(targets.values()), outEdges, witnessLimit)
+
+			for w, weight in targets.items():
+				if costs.get(w, inf) > weight:
+					shortcuts.append((u, w, weight))
+
+		return shortcuts
+
+	@staticmethod
+	def witnessSearch(start, avoid, maximumCost, outEdges, witnessLimit):
+		"""Uniform cost search from start in the remaining graph that never visits avoid, stopping past maximumCost or witnessLimit explored vertices"""
+
+		frontier = IndexedPriorityQueue()
+		frontier.push(start, 0)
+		explored = set()
+
+		# The cheapest known path to every vertex reached, explored or not, any of which may be a witness
+		costs = {start : 0}
+
+		while len(frontier) > 0 and len(explored) < witnessLimit:
+
+			vertex, cost = frontier.pop()
+			explored.add(vertex)
+
+			if cost > maximumCost:
+				break
+
+			for child, weight in outEdges[vertex].items():
+				if child != avoid and child not in explored:
+					if child not in frontier:
+						frontier.push(child, cost + weight)
+						costs[child] = cost + weight
+					elif cost + weight < frontier[child]:
+						frontier.decreaseKey(child, cost + weight)
+						costs[child] = cost + weight
+
+		return costs
+
+	def search(self, start, goal):
+		"""Given a start vertex and goal vertex this function returns the cheapest path and its cost"""
+
+		if start not in self.ranks or goal not in self.ranks:
+			raise Exception("No such vertex")
+
+		if start == goal:
+			return [start], 0
+
+		# Direction 0 searches upwards from the start, direction 1 searches upwards from the goal along reversed edges
+		edges = {0 : self.upward, 1 : self.downward}
+		frontier = {0 : IndexedPriorityQueue(), 1 : IndexedPriorityQueue()}
+		frontier[0].push(start, 0)
+		frontier[1].push(goal, 0)
+		costs = {0 : {}, 1 : {}}
+		parents = {0 : {start : None}, 1 : {goal : None}}
+
+		best = inf
+		meeting = None
+
+		# Each direction keeps going until its cheapest vertex costs at least as much as the best path found
+		while True:
+
+			active = [i for i in [0, 1] if len(frontier[i]) > 0 and frontier[i].peek()[1] < best]
+			if len(active) == 0:
+				break
+
+			i = min(active, key = lambda i: frontier[i].peek()[1])
+			vertex, cost = frontier[i].pop()
+			costs[i][vertex] = cost
+
+			if vertex in costs[1 - i] and cost + costs[1 - i][vertex] < best:
+				best = cost + costs[1 - i][vertex]
+				meeting = vertex
+
+			for child, weight in edges[i][vertex].items():
+				if child not in costs[i]:
+					if child not in frontier[i]:
+						frontier[i].push(child, cost + weight)
+						parents[i][child] = vertex
+					elif cost + weight < frontier[i][child]:
+						frontier[i].decreaseKey(child, cost + weight)
+						parents[i][child] = vertex
+
+		if meeting is None:
+			raise NoPathError(f"No path exists between {start} and {goal}")
+
+		path = reconstructPath(parents[0], meeting) + list(reversed(reconstructPath(parents[1], meeting)))[1:]
+		return self.unpack(path), best
+
+	def unpack(self, path):
+		"""Replace every shortcut in a path with the original edges it bypasses"""
+
+		unpacked = [path[0]]
+		stack = [(path[i], path[i+1]) for i in reversed(range(len(path) - 1))]
+
+		while len(stack) > 0:
+
+			u, w = stack.pop()
+
+			if (u, w) in self.middles:
+				middle = self.middles[(u, w)]
+				stack.append((middle, w))
+				stack.append((u, middle))
+			else:
+				unpacked.append(w)
+
+		return unpacked
+
+	@property
+	def noShortcuts(self):
+		"""The number of shortcuts added by preprocessing"""
+		return len(self.middles)
+
+	def save(self, filePath):
+		"""Save the hierarchy as a JSON object"""
+
+		with open(filePath, 'w') as fp:
+			json.dump({'ranks' : self.ranks,
+					   'upward' : self.upward,
+					   'downward' : self.downward,
+					   'middles' : [[u, w, middle] for (u, w), middle in self.middles.items()]}, fp)
+
+	@classmethod
+	def load(cls, filePath):
+		"""Load a hierarchy saved by save"""
+
+		with open(filePath, 'r') as fp:
+			data = json.load(fp)
+
+		return cls(data['ranks'], data['upward'], data['downward'], {(u, w) : middle for u, w, middle in data['middles']})
+
+	def __str__(self):
+		return f"A contraction hierarchy over {len(self.ranks)} vertices with {self.noShortcuts} shortcuts"
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+	hierarchy = ContractionHierarchy.preprocess(graph)
+	print(hierarchy)
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
+
+	print(hierarchy.search(start, goal))
@@ -0,0 +1,247 @@
+# An incremental planner using the D* Lite search algorithm, for graphs whose edge weights keep changing
+# D* Lite searches backwards from the goal, keeping for every vertex its cost to the goal (g) and a one step lookahead of it (rhs),
+# where rhs is the cheapest edge weight plus g over the edges leaving the vertex
+# Vertices where the two differ are inconsistent and are kept in a priority queue, the search makes them consistent in order until the start is
+# When edges change only the vertices they leave have their rhs recomputed, so replanning repairs just the part of the search the change affects
+# The planner subscribes to the edge changes of a Graph, and the start can be moved along the path as it is followed
+# The heuristic function must take (vertex, graph, start, goal) as its arguments, it is used to estimate the cost from the start to each vertex
+# and should be consistent for the planner to find the cheapest path
+# Returns the path and cost
+
+from Graphs import Graph, NoPathError, loadGraph
+from PriorityQueue import IndexedPriorityQueue
+from AStar import heuristic
+from math import inf
+
+class IncrementalPlanner():
+
+	def __init__(self, graph, start, goal, heuristic):
+		"""
+		Creates a planner for paths from start to goal on the graph, which must be a Graphs.Graph
+		The planner is told about every change to the graph until close is called
+		"""
+
+		if not hasattr(graph, 'subscribe'):
+			raise Exception("The graph must notify the planner of edge changes")
+
+		self.graph = graph
+		self.start = start
+		self.goal = goal
+		self.heuristic = heuristic
+
+		# The vertices whose edges have changed since the last search, and whether the whole graph has
+		self.changed = set()
+		self.reset = True
+		self.stats = None
+
+		graph.subscribe(self.edgeChanged)
+
+	def edgeChanged(self, vertex, edge):
+		"""Record a change to the edge from vertex to edge, called by the graph"""
+
+		if vertex is None:
+			self.reset = True
+		else:
+			self.changed.add(vertex)
+
+	def close(self):
+		"""Stop listening to changes to the graph"""
+		self.graph.unsubscribe(self.edgeChanged)
+
+	def moveStart(self, start):
+		"""Move the start, for example to the next vertex along the path once it has been reached"""
+
+		if start not in self.graph.graphDict:
+			raise Exception("No such vertex")
+
+		self.start = start
+
+	def initialise(self):
+		"""Throw away the search and start again from the goal alone"""
+
+		self.costs = {}
+		self.lookaheads = {self.goal : 0}
+		self.queue = IndexedPriorityQueue()
+		self.km = 0
+		self.lastStart = self.start
+		self.heuristics = {}
+		self.queue.push(self.goal, self.keyOf(self.goal))
+
+		self.changed.clear()
+		self.reset = False
+
+	def estimate(self, vertex):
+		"""The heuristic estimate of the cost from the start to vertex"""
+
+		h = self.heuristics.get(vertex)
+
+		if h is None:
+			h = self.heuristics[vertex] = self.heuristic(self.start, self.graph, self.start, vertex)
+			if self.stats is not None:
+				self.stats.heuristicCalls += 1
+
+		return h
+
+	def keyOf(self, vertex):
+		"""The priority of an inconsistent vertex, ordered by its estimated total cost and then by its cost to the goal"""
+
+		cost = min(self.costs.get(vertex, inf), self.lookaheads.get(vertex, inf))
+		return (cost + self.estimate(vertex) + self.km, cost)
+
+	def updateVertex(self, vertex):
+		"""Recompute the lookahead of a vertex from the edges leaving it and queue it if it is inconsistent"""
+
+		graph = self.graph
+
+		if vertex != self.goal:
+			lookahead = inf
+			for child in graph.edgesOf(vertex):
+				if child != vertex:
+					lookahead = min(lookahead, graph.edgeWeight(vertex, child) + self.costs.get(child, inf))
+			self.lookaheads[vertex] = lookahead
+
+		consistent = self.costs.get(vertex, inf) == self.lookaheads.get(vertex, inf)
+
+		if vertex in self.queue:
+			if consistent:
+				self.queue.remove(vertex)
+			else:
+				self.queue.update(vertex, self.keyOf(vertex))
+				if self.stats is not None:
+					self.stats.reopen(vertex, None)
+
+		elif not consistent:
+			self.queue.push(vertex, self.keyOf(vertex))
+			if self.stats is not None:
+				self.stats.generate(vertex, None, len(self.queue))
+
+	def computeShortestPath(self):
+		"""Make inconsistent vertices consistent, cheapest first, until the cost from the start is known"""
+
+		queue = self.queue
+		costs = self.costs
+		lookaheads = self.lookaheads
+		start = self.start
+
+		while len(queue) > 0 and (queue.peek()[1] < self.keyOf(start) or lookaheads.get(start, inf) != costs.get(start, inf)):
+
+			vertex, oldKey = queue.peek()
+			newKey = self.keyOf(vertex)
+
+			# Keys computed before the start moved may be too low, so requeue the vertex with its current key
+			if oldKey < newKey:
+				queue.update(vertex, newKey)
+				continue
+
+			if self.stats is not None:
+				self.stats.expand(vertex)
+
+			queue.pop()
+
+			# A vertex whose cost has fallen is settled and its parents may now be reached more cheaply through it
+			if costs.get(vertex, inf) > lookaheads.get(vertex, inf):
+				costs[vertex] = lookaheads[vertex]
+				for parent in self.graph.reverseEdgesOf(vertex):
+					self.updateVertex(parent)
+
+			# A vertex whose cost has risen is reset, and it and its parents recomputed
+			else:
+				costs[vertex] = inf
+				self.updateVertex(vertex)
+				for parent in self.graph.reverseEdgesOf(vertex):
+					self.updateVertex(parent)
+
+	def search(self, stats = None):
+		"""
+		Find the cheapest path from the current start to the goal, repairing the previous search for any edges changed since
+		If a SearchStats is given the vertices expanded, generated and requeued and the heuristic calls are recorded in it
+		"""
+
+		self.stats = stats
+		graph = self.graph
+
+		if self.start not in graph.graphDict or self.goal not in graph.graphDict:
+			raise Exception("No such vertex")
+
+		if self.reset:
+			self.initialise()
+
+		# Moving the start lowers every estimate by at most the estimate between the old and new starts, so raise all keys by that instead
+		if self.start != self.lastStart:
+			self.km += self.heuristic(self.lastStart, graph, self.lastStart, self.start)
+			self.lastStart = self.start
+			self.heuristics = {}
+
+		# Recompute the lookahead of every vertex with a changed edge, forgetting those that have been removed
+		for vertex in self.changed:
+			if vertex in graph.graphDict:
+				self.updateVertex(vertex)
+			else:
+				self.costs.pop(vertex, None)
+				self.lookaheads.pop(vertex, None)
+				if vertex in self.queue:
+					self.queue.remove(vertex)
+
+		self.changed.clear()
+		self.computeShortestPath()
+
+		cost = self.costs.get(self.start, inf)
+
+		if cost == inf:
+			raise NoPathError(f"No path from {self.start} to {self.goal}")
+
+		return self.pathFrom(self.start), cost
+
+	def pathFrom(self, vertex):
+		"""Follow the cheapest edge plus cost to the goal from each vertex to rebuild the path to the goal"""
+
+		graph = self.graph
+		path = [vertex]
+		visited = {vertex}
+
+		while vertex != self.goal:
+
+			parent = vertex
+			vertex = min((child for child in graph.edgesOf(parent) if child != parent), key = lambda child: graph.edgeWeight(parent, child) + self.costs.get(child, inf))
+
+			# Zero weight cycles could otherwise be followed forever
+			if vertex in visited:
+				raise Exception("The search did not converge to a path")
+
+			path.append(vertex)
+			visited.add(vertex)
+
+		return path
+
+	def __str__(self):
+		return f"An incremental planner from {self.start} to {self.goal}"
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
+
+	planner = IncrementalPlanner(graph, start, goal, heuristic)
+	print(planner.search())
+
+	# Keep replanning as edges are changed
+	while True:
+
+		print("Edge to change? as vertex,edge,weight or vertex,edge to remove it, enter 0 to stop")
+		change = input("")
+		if change == '0':
+			break
+
+		fields = change.split(",")
+		if len(fields) == 2:
+			graph.removeEdge(fields[0], fields[1])
+		else:
+			graph.addEdge(fields[0], fields[1], int(fields[2]))
+
+		print(planner.search())
+
+	planner.close()
@@ -3,49 +3,55 @@
 # Takes in a graph, start vertex and goal vertex and finds a path from the start vertex to the goal vertex
 # Returns the path and cost
 
-from Graphs import Graph, loadGraph
+from Graphs import Graph, NoPathError, loadGraph, reconstructPath, pathCost
 from math import inf
 
 
-def depthFirstSearch(graph, start, goal, limit = inf):
+def depthFirstSearch(graph, start, goal, limit = inf, stats = None):
+	"""
+	Given a graph, start node and goal node, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	"""
 
 	frontier = [(start, 0)]
-	explored = []
-	paths = {start : [start]}
+	# Every vertex that has been in the frontier, whether or not it has been explored yet
+	discovered = {start}
+	parents = {start : None}
 
 	# while the frontier is not empty, until the goal is reached
 	while True:
 
 		if len(frontier) == 0:
-			raise Exception(f"No path exist between {start} and {goal} with a depth limit of {limit}")
+			raise NoPathError(f"No path exist between {start} and {goal} with a depth limit of {limit}")
 
 		# get the next vertex to explore
 		vertex, depth = frontier.pop()
 
 		if depth < limit:
 
+			if stats is not None:
+				stats.expand(vertex)
+
 			# for each edge of the vertex
 			for child in graph.edgesOf(vertex):
 
 				# if the vertex has not yet been discovered
-				if child != vertex and child not in [f[0] for f in frontier] and child not in explored:
+				if child != vertex and child not in discovered:
 
-					# if we have reached the goal vertex then break the loop
-					if child == goal:
+					parents[child] = vertex
 
-						solution = paths[vertex] + [child]
-									
-						cost = 0
-						for i in range(len(solution)-1):
-							cost += graph.edgeWeight(solution[i], solution[i+1])
+					if stats is not None:
+						stats.generate(child, vertex, len(frontier) + 1)
 
-						return (solution, cost)
+					# if we have reached the goal vertex then rebuild the path and calculate its cost
+					if child == goal:
 
-					# add itself to the frontier and store its path
-					frontier.append((child, depth + 1))
-					paths[child] = paths[vertex] + [child]
+						solution = reconstructPath(parents, child)
+						return (solution, pathCost(graph, solution))
 
-		explored.append(vertex)
+					# add itself to the frontier
+					frontier.append((child, depth + 1))
+					discovered.add(child)
 
 if __name__ == '__main__':
 	
@@ -62,5 +68,3 @@ if __name__ == '__main__':
 	
 
 	print(depthFirstSearch(graph, start, goal, limit))
-
-
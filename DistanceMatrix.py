@@ -0,0 +1,82 @@
+# Batched one-to-many and many-to-many shortest path queries
+# A single search tree is grown from each distinct source and reused for every target, stopping once all targets are reached
+# Weighted graphs use the uniform cost search tree, graphs where every edge costs the same can use the cheaper breadth first search tree
+# Returns a matrix of costs, one row per source and one column per target, and optionally the matching paths
+
+from Graphs import Graph, loadGraph, reconstructPath, pathCost
+from UniformCost import uniformCostTree
+from BreadthFirst import breadthFirstTree
+from array import array
+from math import inf
+
+def distanceMatrix(graph, sources, targets, paths = False, unitCost = False):
+	"""
+	Given a graph, a list of sources and a list of targets this function returns (costs, paths)
+	costs[i][j] is the cost of the cheapest path from sources[i] to targets[j], or inf if there is no path
+	If paths is True then paths[i][j] is that path, or None if there is no path, otherwise paths is None
+	If unitCost is True breadth first search is used, which only finds the cheapest paths when every edge has the same weight
+	"""
+
+	costs = []
+	allPaths = [] if paths else None
+	rows = {}
+
+	for source in sources:
+
+		# Repeated sources share the row computed the first time
+		if source not in rows:
+			rows[source] = oneToMany(graph, source, targets, paths, unitCost)
+
+		rowCosts, rowPaths = rows[source]
+		costs.append(rowCosts)
+		if paths:
+			allPaths.append(rowPaths)
+
+	return costs, allPaths
+
+def oneToMany(graph, source, targets, paths = False, unitCost = False):
+	"""
+	Given a graph, a source and a list of targets this function returns (costs, paths) for a single row of distanceMatrix
+	costs is an array of doubles with inf for each unreachable target
+	"""
+
+	if unitCost:
+		parents = breadthFirstTree(graph, source, targets)
+		treeCosts = None
+	else:
+		treeCosts, parents = uniformCostTree(graph, source, targets)
+
+	rowCosts = array('d', [inf]) * len(targets)
+	rowPaths = [None] * len(targets) if paths else None
+
+	for j, target in enumerate(targets):
+
+		# A breadth first tree reaches every vertex it discovers, a uniform cost tree only finalises the ones it explored
+		if target not in (parents if unitCost else treeCosts):
+			continue
+
+		if unitCost:
+			path = reconstructPath(parents, target)
+			rowCosts[j] = pathCost(graph, path)
+		else:
+			rowCosts[j] = treeCosts[target]
+			path = reconstructPath(parents, target) if paths else None
+
+		if paths:
+			rowPaths[j] = path
+
+	return rowCosts, rowPaths
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Source vertices? (separated by spaces)")
+	sources = input("").split()
+	print("Target vertices? (separated by spaces)")
+	targets = input("").split()
+
+	costs, _ = distanceMatrix(graph, sources, targets)
+
+	for source, row in zip(sources, costs):
+		print(source, list(row))
@@ -0,0 +1,164 @@
+# Streaming loader for graphs stored as lists of edges
+# Supports whitespace separated edge lists, CSV files and DIMACS shortest path (.gr) files
+# Lines are read in chunks so only the graph being built, not the whole file, is held in memory
+# Multiple edges between two nodes are not allowed in a graph, so only the cheapest of any repeated edge is kept
+# The graph is built in a single step once every edge has been read
+
+from Graphs import Graph
+from CompactGraph import CompactGraph
+from time import perf_counter
+import csv
+
+def loadEdgeList(filePath, fileFormat = None, symmetrize = False, compact = False, chunkSize = 1 << 20, stats = None, header = None):
+	"""
+	Load a graph from an edge list file
+	fileFormat is "EDGELIST", "CSV" or "DIMACS", if None it is chosen from the file extension (.csv, .gr, otherwise EDGELIST)
+		EDGELIST lines are "vertex edge [weight]", lines starting with # or % are comments
+		CSV rows are vertex,edge[,weight], a first row with a weight that isn't a number is treated as a header
+		unless header is given, True if the first row is a header and False if it is an edge
+		A header can't be told apart from an edge in a two column file, so there its first row is kept as an edge unless header is True
+		DIMACS lines are "a vertex edge weight", with "p sp noVertices noEdges" declaring vertices 1 to noVertices
+	Edges without a weight have a weight of 1
+	If symmetrize is True an opposite direction edge with the same weight is added wherever one doesn't exist, as in Graph.transformIntoBidirectional
+	If compact is True a CompactGraph is returned instead of a Graph
+	chunkSize is roughly the number of bytes read at a time
+	If a stats dictionary is given the number of edges read and kept, the time taken and the edges read per second are stored in it
+	"""
+
+	if fileFormat is None:
+		if filePath.endswith('.csv'):
+			fileFormat = "CSV"
+		elif filePath.endswith('.gr'):
+			fileFormat = "DIMACS"
+		else:
+			fileFormat = "EDGELIST"
+
+	parsers = {"EDGELIST" : parseEdgeList, "CSV" : lambda lines, graphDict: parseCSV(lines, graphDict, header), "DIMACS" : parseDIMACS}
+
+	if fileFormat not in parsers:
+		raise Exception(f"Unknown edge list format {fileFormat}")
+
+	began = perf_counter()
+	graphDict = {}
+	edgesRead = 0
+
+	with open(filePath, 'r', newline = '') as fp:
+
+		for vertex, edge, weight in parsers[fileFormat](readChunks(fp, chunkSize), graphDict):
+
+			edgesRead += 1
+
+			edgeDict = graphDict.get(vertex)
+			if edgeDict is None:
+				edgeDict = graphDict[vertex] = {}
+			if edge not in graphDict:
+				graphDict[edge] = {}
+
+			# Keep only the cheapest of repeated edges
+			current = edgeDict.get(edge)
+			if current is None or weight < current:
+				edgeDict[edge] = weight
+
+	if symmetrize:
+		for vertex, edge in [(v, e) for v, edgeDict in graphDict.items() for e in edgeDict.keys()]:
+			if vertex not in graphDict[edge]:
+				graphDict[edge][vertex] = graphDict[vertex][edge]
+
+	graph = CompactGraph.fromDict(graphDict) if compact else Graph(graphDict)
+
+	if stats is not None:
+		seconds = perf_counter() - began
+		stats['edgesRead'] = edgesRead
+		stats['edgesKept'] = graph.noEdges
+		stats['seconds'] = seconds
+		stats['edgesPerSecond'] = edgesRead / seconds if seconds > 0 else 0
+
+	return graph
+
+def readChunks(fp, chunkSize):
+	"""Yield the lines of a file, reading roughly chunkSize bytes at a time"""
+
+	while True:
+
+		lines = fp.readlines(chunkSize)
+		if len(lines) == 0:
+			return
+
+		yield from lines
+
+def parseWeight(text):
+	"""Parse a weight as an int where possible, otherwise as a float"""
+
+	try:
+		return int(text)
+	except ValueError:
+		return float(text)
+
+def isWeight(text):
+	"""Whether text can be parsed as a weight"""
+
+	try:
+		parseWeight(text)
+		return True
+	except ValueError:
+		return False
+
+def parseEdgeList(lines, graphDict):
+	"""Yield the (vertex, edge, weight) of each line of a whitespace separated edge list"""
+
+	for line in lines:
+
+		fields = line.split()
+
+		if len(fields) == 0 or fields[0][0] in '#%':
+			continue
+
+		if len(fields) < 2:
+			raise Exception(f"Edge list line has too few fields: {line.strip()}")
+
+		yield fields[0], fields[1], parseWeight(fields[2]) if len(fields) > 2 else 1
+
+def parseCSV(lines, graphDict, header = None):
+	"""
+	Yield the (vertex, edge, weight) of each row of a CSV file
+	If header is None the first row is skipped as a header only when it has a weight that is not a number
+	"""
+
+	firstRow = True
+
+	for row in csv.reader(lines):
+
+		if len(row) == 0:
+			continue
+
+		if len(row) < 2:
+			raise Exception(f"CSV row has too few fields: {','.join(row)}")
+
+		# Only the first row may be a header
+		if firstRow:
+			firstRow = False
+
+			if header is None:
+				header = len(row) > 2 and not isWeight(row[2])
+
+			if header:
+				continue
+
+		weight = parseWeight(row[2]) if len(row) > 2 else 1
+
+		yield row[0].strip(), row[1].strip(), weight
+
+def parseDIMACS(lines, graphDict):
+	"""Yield the (vertex, edge, weight) of each arc line of a DIMACS shortest path file"""
+
+	for line in lines:
+
+		if line[0] == 'a':
+			_, vertex, edge, weight = line.split()
+			yield vertex, edge, int(weight) if weight.isdigit() else parseWeight(weight)
+
+		# The problem line declares every vertex, including those without edges
+		elif line[0] == 'p':
+			noVertices = int(line.split()[2])
+			for i in range(1, noVertices + 1):
+				graphDict.setdefault(str(i), {})
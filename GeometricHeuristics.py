@@ -0,0 +1,115 @@
+# Geometric heuristics for the A* search algorithm on graphs whose vertices have coordinates
+# The estimate of a vertex is the straight line distance from it to the goal, multiplied by a scale
+# The distance can be:
+#	EUCLIDEAN, the planar distance between (x, y) coordinates
+#	OCTILE, the shortest distance between (x, y) coordinates moving only horizontally, vertically and diagonally, as on a grid
+#	HAVERSINE, the great circle distance in metres between (latitude, longitude) coordinates in degrees
+# Each distance obeys the triangle inequality, so the heuristic is admissible (and consistent) whenever no edge weighs less than
+# its scaled distance, admissibleFor chooses the largest scale for which this holds
+# The heuristic takes (vertex, graph, start, goal) as its arguments so it can be passed straight to AStarSearch
+
+from Graphs import Graph, loadGraph
+from AStar import AStarSearch
+from math import radians, sin, cos, asin, sqrt, hypot, inf
+
+# The mean radius of the Earth in metres
+EARTH_RADIUS = 6371008.8
+
+def euclideanDistance(a, b):
+	"""The planar distance between two (x, y) points"""
+	return hypot(a[0] - b[0], a[1] - b[1])
+
+def octileDistance(a, b):
+	"""The distance between two (x, y) points moving only horizontally, vertically and diagonally"""
+
+	dx = abs(a[0] - b[0])
+	dy = abs(a[1] - b[1])
+	return max(dx, dy) + (sqrt(2) - 1) * min(dx, dy)
+
+def haversineDistance(a, b):
+	"""The great circle distance in metres between two (latitude, longitude) points in degrees"""
+
+	latitudeA, longitudeA = radians(a[0]), radians(a[1])
+	latitudeB, longitudeB = radians(b[0]), radians(b[1])
+
+	h = sin((latitudeB - latitudeA) / 2) ** 2 + cos(latitudeA) * cos(latitudeB) * sin((longitudeB - longitudeA) / 2) ** 2
+	return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(h)))
+
+DISTANCES = {
+	"EUCLIDEAN" : euclideanDistance,
+	"OCTILE" : octileDistance,
+	"HAVERSINE" : haversineDistance,
+}
+
+class GeometricHeuristic():
+
+	def __init__(self, metric = "EUCLIDEAN", scale = 1):
+		"""
+		Creates a heuristic estimating the cost from a vertex to the goal as scale times the distance between them
+		metric is "EUCLIDEAN", "OCTILE" or "HAVERSINE"
+		The heuristic is only admissible if no edge weighs less than scale times the distance between its vertices
+		"""
+
+		if metric not in DISTANCES:
+			raise Exception(f"Unknown distance metric {metric}")
+
+		self.metric = metric
+		self.distance = DISTANCES[metric]
+		self.scale = scale
+
+	@classmethod
+	def admissibleFor(cls, graph, metric = "EUCLIDEAN"):
+		"""
+		Create the heuristic with the largest scale that keeps it admissible on the graph
+		That is the smallest ratio of the weight of an edge to the distance between its vertices
+		"""
+
+		if metric not in DISTANCES:
+			raise Exception(f"Unknown distance metric {metric}")
+
+		distance = DISTANCES[metric]
+		scale = inf
+
+		for vertex in graph.vertices:
+			point = graph.coordinatesOf(vertex)
+			for edge in graph.edgesOf(vertex):
+				length = distance(point, graph.coordinatesOf(edge))
+				if length > 0:
+					scale = min(scale, graph.edgeWeight(vertex, edge) / length)
+
+		# Without any edge of positive length every vertex is at the same point, so any scale is admissible
+		return cls(metric, scale if scale < inf else 1)
+
+	def __call__(self, vertex, graph, start, goal):
+		"""The scaled distance from vertex to goal"""
+		return self.scale * self.distance(graph.coordinatesOf(vertex), graph.coordinatesOf(goal))
+
+	def estimates(self, vertices, graph, start, goal):
+		"""The estimate of each of the vertices as a list, the batched form of calling the heuristic on each vertex"""
+
+		target = graph.coordinatesOf(goal)
+		distance = self.distance
+		scale = self.scale
+		return [scale * distance(graph.coordinatesOf(vertex), target) for vertex in vertices]
+
+	def __str__(self):
+		return f"A {self.metric.lower()} heuristic with a scale of {self.scale}"
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	if not graph.hasCoordinates:
+		raise Exception("Every vertex of the graph needs coordinates")
+
+	print("Distance metric? (EUCLIDEAN/OCTILE/HAVERSINE)")
+	metric = input("")
+	heuristic = GeometricHeuristic.admissibleFor(graph, metric)
+	print(heuristic)
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex?")
+	goal = input("")
+
+	print(AStarSearch(graph, start, goal, heuristic))
@@ -0,0 +1,103 @@
+# A compact binary file format for graphs that can be memory mapped instead of parsed
+# The file is laid out as:
+#	a 40 byte header: the magic bytes, the number of vertices, the number of edges, the length of the name table, the weight type and a flags byte
+#	the CSR offsets, targets and weights of a CompactGraph, each entry being 8 bytes
+#	if the COORDINATES flag is set, the (x, y) positions of every vertex as pairs of 8 byte doubles
+#	the vertex names encoded as UTF-8 and separated by NUL bytes
+# Opening a file maps it into memory and uses the arrays in place, so processes opening the same file share its pages
+# Numbers are stored in little endian byte order
+
+from CompactGraph import CompactGraph, splitJSONGraph
+import struct
+import mmap
+import json
+import sys
+
+MAGIC = b'SRCHGRPH'
+HEADER = struct.Struct('<8sQQQ1sB6x')
+
+# Set in the flags byte of the header if the graph is bidirectional, and if the vertex positions are stored
+BIDIRECTIONAL = 1
+COORDINATES = 2
+
+def isGraphFile(filePath):
+	"""Test whether a file starts with the magic bytes of the binary graph format"""
+
+	with open(filePath, 'rb') as fp:
+		return fp.read(len(MAGIC)) == MAGIC
+
+def writeGraphFile(graph, filePath):
+	"""
+	Write a graph to a binary graph file
+	The graph can be a Graphs.Graph or a CompactGraph
+	"""
+
+	if sys.byteorder != 'little':
+		raise Exception("Binary graph files can only be written on little endian machines")
+
+	if not isinstance(graph, CompactGraph):
+		graph = CompactGraph.fromGraph(graph)
+
+	if any('\0' in name for name in graph.names):
+		raise Exception("Vertex names can't contain NUL characters")
+
+	names = '\0'.join(graph.names).encode('utf-8')
+	flags = (BIDIRECTIONAL if graph.bidirectional else 0) | (COORDINATES if graph.positions is not None else 0)
+	buffers = [graph.offsets, graph.targets, graph.weights] + ([graph.positions] if graph.positions is not None else [])
+
+	with open(filePath, 'wb') as fp:
+		fp.write(HEADER.pack(MAGIC, graph.noVertices, graph.noEdges, len(names), graph.weightType.encode(), flags))
+		for buffer in buffers:
+			fp.write(memoryview(buffer).cast('B'))
+		fp.write(names)
+
+def openGraphFile(filePath):
+	"""
+	Open a binary graph file as a CompactGraph without copying its arrays
+	The file stays mapped into memory for as long as the graph is in use
+	"""
+
+	if sys.byteorder != 'little':
+		raise Exception("Binary graph files can only be read on little endian machines")
+
+	with open(filePath, 'rb') as fp:
+		mapping = mmap.mmap(fp.fileno(), 0, access = mmap.ACCESS_READ)
+
+	magic, noVertices, noEdges, namesLength, weightType, flags = HEADER.unpack_from(mapping, 0)
+
+	if magic != MAGIC:
+		raise Exception(f"{filePath} is not a binary graph file")
+
+	view = memoryview(mapping)
+	position = HEADER.size
+
+	# Slice each array out of the mapping, the memoryviews keep the mapping open
+	layout = [('q', noVertices + 1), ('q', noEdges), (weightType.decode(), noEdges)]
+	if flags & COORDINATES:
+		layout.append(('d', 2 * noVertices))
+
+	buffers = []
+	for typecode, length in layout:
+		buffers.append(view[position:position + 8 * length].cast(typecode))
+		position += 8 * length
+
+	names = bytes(view[position:position + namesLength]).decode('utf-8').split('\0') if noVertices > 0 else []
+	positions = buffers.pop() if flags & COORDINATES else None
+
+	return CompactGraph(names, *buffers, bidirectional = bool(flags & BIDIRECTIONAL), positions = positions)
+
+def convertJSONGraph(jsonPath, graphPath):
+	"""Convert a graph stored in the JSON format read by Graphs.loadGraph into a binary graph file"""
+
+	with open(jsonPath, 'r') as fp:
+		writeGraphFile(CompactGraph.fromDict(*splitJSONGraph(json.load(fp))), graphPath)
+
+if __name__ == '__main__':
+
+	print("Please enter the destination of the JSON graph to convert")
+	jsonPath = input("")
+	print("Please enter the destination of the binary graph file to write")
+	graphPath = input("")
+
+	convertJSONGraph(jsonPath, graphPath)
+	print(openGraphFile(graphPath))
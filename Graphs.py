@@ -2,8 +2,15 @@
 # All edges are directional
 # Loops from a vertex to the same vertex are allowed
 # Multiple edges between two nodes are not allowed 
-
-from random import randint
+# Vertices can optionally have coordinates, used by the geometric heuristics and the spatial index
+
+from itertools import accumulate
+from math import isqrt
+import random
+from contextlib import contextmanager
+from collections import namedtuple
+from GraphFile import isGraphFile, openGraphFile
+from CompactGraph import splitJSONGraph
 import json
 
 def loadGraph():
@@ -15,8 +22,13 @@ def loadGraph():
 
 	if filePath != '0':
 
-		with open(filePath, 'r') as fp:
-			graph = Graph(json.load(fp))
+		# Binary graph files are memory mapped rather than parsed
+		if isGraphFile(filePath):
+			graph = openGraphFile(filePath)
+
+		else:
+			with open(filePath, 'r') as fp:
+				graph = Graph(*splitJSONGraph(json.load(fp)))
 
 	else:
 
@@ -37,49 +49,194 @@ def loadGraph():
 
 	return graph
 
+class NoPathError(Exception):
+	"""Raised by the searches when there is no path between the start and goal vertices"""
+
+# The result of a search from many sources to many goals, source and goal are the ones the path found joins
+MultiSearchResult = namedtuple('MultiSearchResult', ['path', 'cost', 'source', 'goal'])
+
+def reconstructPath(parents, vertex):
+	"""
+	Rebuild the path to a vertex from a map of parent pointers
+	The vertex the search started from must have a parent of None
+	"""
+
+	path = []
+	while vertex is not None:
+		path.append(vertex)
+		vertex = parents[vertex]
+
+	path.reverse()
+	return path
+
+def pathCost(graph, path):
+	"""The total weight of the edges along a path"""
+
+	cost = 0
+	for i in range(len(path)-1):
+		cost += graph.edgeWeight(path[i], path[i+1])
+	return cost
+
+def pairOf(k, noVertices):
+	"""
+	Get the kth pair (i, j) with i < j < noVertices, counting along each row of pairs in turn
+	Used to sample pairs of different vertices without replacement
+	"""
+
+	total = noVertices * (noVertices - 1) // 2
+	i = noVertices - 2 - (isqrt(8 * (total - k - 1) + 1) - 1) // 2
+	j = k + i + 1 - total + (noVertices - i) * (noVertices - i - 1) // 2
+	return i, j
+
 class Graph():
 	
-	def __init__(self, graphDict = None):
+	def __init__(self, graphDict = None, coordinates = None):
 		"""
 		Creates a new graph and stores the graph dictionary
 		The graph dictionary should be of type:
 			{'a' : {'b' : 10, 'c' : 5},
 			 'b' : {'a' : 10},
 			 'c' : {'a' : 5}}
+		Coordinates are optional and should be of type:
+			{'a' : (0.0, 1.5), 'b' : (2.0, 0.5), 'c' : (1.0, 1.0)}
 		Also generates the edges of the graph and test whether the graph is bidirectional
 		"""
 
-		if graphDict is not None:
-			self.graphDict = graphDict
-			self.generateEdges()
+		self.graphDict = graphDict if graphDict is not None else {}
+		self.coordinates = {vertex : tuple(point) for vertex, point in coordinates.items()} if coordinates is not None else {}
 
-		else:
-			self.graphDict = {}
+		# Increased by every change to the graph, so anything computed from it can tell whether it is out of date
+		self.version = 0
+
+		# Number of nested batch() contexts currently open, and whether a rebuild was deferred by one
+		self.batchDepth = 0
+		self.stale = False
 
-		self.testBidirectional()
+		# Functions called with (vertex, edge) whenever an edge is added, removed or reweighted
+		self.listeners = []
+
+		self.generateEdges()
 
 	def testBidirectional(self):
 		"""Tests whether the graph is bidirectional, returns True or False"""
 
-		# Assume it is bidirectional
-		self.bidirectional = True
+		# Count the edges whose opposite direction edge doesn't exist
+		self.unmatchedEdges = 0
+		for vertex, edgeDict in self.graphDict.items():
+			for edge in edgeDict.keys():
+				if vertex not in self.graphDict[edge]:
+					self.unmatchedEdges += 1
 
-		# For each edge
-		for vertex in self.vertices:
-			for edge in self.edgesOf(vertex):
+		self.bidirectional = self.unmatchedEdges == 0
+		return self.bidirectional
 
-				# If opposite direction edge doesn't exist set bidirectional to false and double break from the loop
-				if vertex not in self.edgesOf(edge):
-					self.bidirectional = False
-					break
+	@contextmanager
+	def batch(self):
+		"""
+		Group many mutations together, for example:
+			with graph.batch():
+				for vertex1, vertex2, weight in updates:
+					graph.addEdge(vertex1, vertex2, weight)
+		The edge set and reverse index are still updated by each mutation
+		Refreshing the bidirectional flag, and any full regeneration of the edges, is deferred until the outermost batch exits
+		"""
+
+		self.batchDepth += 1
+		try:
+			yield self
+		finally:
+			self.batchDepth -= 1
+			if self.batchDepth == 0:
+				self.commit()
 
-			if self.bidirectional == False:
-				break
+	def commit(self):
+		"""Apply the work deferred while in a batch"""
 
-	def randomlyGenerate(self, noVertices, noEdges, weightMinimum, weightMaximum, bidirectional = False):
+		if self.stale:
+			self.rebuildEdges()
+		else:
+			self.bidirectional = self.unmatchedEdges == 0
+
+	def subscribe(self, listener):
 		"""
-		Randomly generate a graph with the given noVertices and noEdges
+		Call listener(vertex, edge) after every change to the edge from vertex to edge, such as by addEdge or removeEdge
+		When a vertex is removed it is called with (vertex, None) once the vertex is gone
+		When the whole graph is regenerated it is called once with (None, None) instead
+		"""
+		self.listeners.append(listener)
+
+	def unsubscribe(self, listener):
+		"""Stop calling a listener added by subscribe"""
+		self.listeners.remove(listener)
+
+	def notify(self, vertex, edge):
+		"""Tell every listener that the edge from vertex to edge has changed"""
+
+		for listener in self.listeners:
+			listener(vertex, edge)
+
+	def linkEdge(self, vertex, edge, weight):
+		"""Store the edge from vertex to edge, updating the edge set, reverse index and bidirectional count"""
+
+		self.version += 1
+
+		# If a full rebuild is already pending only the graph dictionary needs to change
+		if self.stale:
+			self.graphDict[vertex][edge] = weight
+			self.notify(vertex, edge)
+			return
+
+		if edge not in self.graphDict[vertex]:
+
+			self.edges.add((vertex, edge))
+
+			# A loop is its own opposite edge, otherwise this edge either matches an existing opposite edge or is unmatched
+			if vertex != edge:
+				if vertex in self.graphDict[edge]:
+					self.unmatchedEdges -= 1
+				else:
+					self.unmatchedEdges += 1
+
+		self.graphDict[vertex][edge] = weight
+		self.reverseDict[edge][vertex] = weight
+
+		if self.batchDepth == 0:
+			self.bidirectional = self.unmatchedEdges == 0
+
+		self.notify(vertex, edge)
+
+	def unlinkEdge(self, vertex, edge):
+		"""Delete the edge from vertex to edge, updating the edge set, reverse index and bidirectional count"""
+
+		self.version += 1
+		del self.graphDict[vertex][edge]
+
+		# If a full rebuild is already pending only the graph dictionary needs to change
+		if self.stale:
+			self.notify(vertex, edge)
+			return
+
+		del self.reverseDict[edge][vertex]
+		self.edges.discard((vertex, edge))
+
+		# Either the opposite edge is now unmatched or this edge was unmatched
+		if vertex != edge:
+			if vertex in self.graphDict[edge]:
+				self.unmatchedEdges += 1
+			else:
+				self.unmatchedEdges -= 1
+
+		if self.batchDepth == 0:
+			self.bidirectional = self.unmatchedEdges == 0
+
+		self.notify(vertex, edge)
+
+	def randomlyGenerate(self, noVertices, noEdges, weightMinimum, weightMaximum, bidirectional = False, seed = None):
+		"""
+		Randomly generate a graph with the given noVertices and noEdges, every graph with that many edges being equally likely (Erdos-Renyi G(n, m))
 		The weight of each edge is in the closed interval [weightMinimum, weightMaximum]
+		If bidirectional is True each edge between two different vertices is created in both directions with the same weight and counts as two edges
+		If a seed is given the same graph is generated every time
 		"""
 
 		if noVertices == 0:
@@ -89,43 +246,135 @@ class Graph():
 		if noEdges > noVertices ** 2:
 			raise Exception("Too many edges to fit into graph")
 
-		self.graphDict = {str(i) : {} for i in range(noVertices)}
+		rng = random if seed is None else random.Random(seed)
+		names = [str(i) for i in range(noVertices)]
+		self.graphDict = {name : {} for name in names}
+		self.coordinates = {}
 
-		iterator = iter(range(noEdges))
+		if not bidirectional:
 
-		# Iterate over the total number of edges
-		for i in iterator:
+			# Sample the edges without replacement, edge k goes from vertex k // noVertices to vertex k % noVertices
+			indices = rng.sample(range(noVertices ** 2), noEdges)
+			weights = rng.choices(range(weightMinimum, weightMaximum + 1), k = noEdges)
 
-			while True:
+			for k, weight in zip(indices, weights):
+				vertex, edge = divmod(k, noVertices)
+				self.graphDict[names[vertex]][names[edge]] = weight
 
-				# Randomly select a vertex
-				vertex = str(randint(0, noVertices-1))
+		else:
 
-				# Randomly select an edge destination, if bidirectional and the last edge then a loop must be created
-				if int(i) == noEdges - 1:
-					edge = vertex
-				else:
-					edge = str(randint(0, noVertices-1))
+			# Each pair of different vertices gives two edges, loops make up any edges the pairs can't
+			noPairs = min(noEdges // 2, noVertices * (noVertices - 1) // 2)
+			noLoops = noEdges - 2 * noPairs
 
-				# If the edge doesn't already exist
-				if edge not in self.graphDict[vertex].keys():
+			pairs = rng.sample(range(noVertices * (noVertices - 1) // 2), noPairs)
+			loops = rng.sample(range(noVertices), noLoops)
+			weights = rng.choices(range(weightMinimum, weightMaximum + 1), k = noPairs + noLoops)
 
-					# Randomly select an edge weight
-					self.graphDict[vertex][edge] = randint(weightMinimum, weightMaximum)
+			for k, weight in zip(pairs, weights):
+				vertex, edge = pairOf(k, noVertices)
+				self.graphDict[names[vertex]][names[edge]] = weight
+				self.graphDict[names[edge]][names[vertex]] = weight
 
-					if bidirectional and vertex != edge:
+			for vertex, weight in zip(loops, weights[noPairs:]):
+				self.graphDict[names[vertex]][names[vertex]] = weight
 
-						# Create the edge in the opposite direction with the same weight
-						self.graphDict[edge][vertex] = self.graphDict[vertex][edge]
+		self.generateEdges()
 
-						# Force a double increment in the iterator as two edges were created
-						next(iterator, None)
+	def randomlyGenerateGrid(self, noRows, noColumns, weightMinimum, weightMaximum, diagonal = False, seed = None):
+		"""
+		Generate a bidirectional grid graph of noRows by noColumns vertices with random edge weights in [weightMinimum, weightMaximum]
+		Vertex row * noColumns + column is joined to the vertices beside, above and below it, and also diagonally if diagonal is True
+		Each vertex has the coordinates (column, row)
+		"""
 
-					break
+		if noRows < 1 or noColumns < 1:
+			raise Exception("Graph must contain at least one vertex")
+
+		rng = random if seed is None else random.Random(seed)
+		names = [str(i) for i in range(noRows * noColumns)]
+		self.graphDict = {name : {} for name in names}
+		self.coordinates = {names[row * noColumns + column] : (float(column), float(row)) for row in range(noRows) for column in range(noColumns)}
+
+		# The offsets to the neighbours that come later in the grid, each edge is added along with its opposite edge
+		steps = [(0, 1), (1, 0)] + ([(1, 1), (1, -1)] if diagonal else [])
+
+		for row in range(noRows):
+			for column in range(noColumns):
+
+				vertex = names[row * noColumns + column]
+
+				for rowStep, columnStep in steps:
+					if row + rowStep < noRows and 0 <= column + columnStep < noColumns:
+						edge = names[(row + rowStep) * noColumns + column + columnStep]
+						weight = rng.randint(weightMinimum, weightMaximum)
+						self.graphDict[vertex][edge] = weight
+						self.graphDict[edge][vertex] = weight
 
 		self.generateEdges()
 
-		self.bidirectional = bidirectional
+	def randomlyGeneratePowerLaw(self, noVertices, noEdges, weightMinimum, weightMaximum, exponent = 2.5, bidirectional = False, seed = None):
+		"""
+		Randomly generate a graph whose vertex degrees follow a power law with the given exponent (Chung-Lu model)
+		Vertex i is chosen as an end of an edge with probability proportional to (i + 1) ** (-1 / (exponent - 1))
+		If bidirectional is True each edge between two different vertices is created in both directions with the same weight and counts as two edges
+		"""
+
+		if noVertices == 0:
+			raise Exception("Graph must contain at least one vertex")
+
+		if exponent <= 1:
+			raise Exception("Power law exponent must be greater than 1")
+
+		if noEdges > noVertices ** 2:
+			raise Exception("Too many edges to fit into graph")
+
+		rng = random if seed is None else random.Random(seed)
+		names = [str(i) for i in range(noVertices)]
+		self.graphDict = {name : {} for name in names}
+		self.coordinates = {}
+
+		cumulativeWeights = list(accumulate((i + 1) ** (-1 / (exponent - 1)) for i in range(noVertices)))
+		vertices = range(noVertices)
+		noCreated = 0
+		failedRounds = 0
+
+		# Draw ends in batches and skip any edge that already exists, until enough edges have been created
+		while noCreated < noEdges:
+
+			remaining = noEdges - noCreated
+			starts = rng.choices(vertices, cum_weights = cumulativeWeights, k = remaining)
+			ends = rng.choices(vertices, cum_weights = cumulativeWeights, k = remaining)
+			createdBefore = noCreated
+
+			for vertex, edge in zip(starts, ends):
+
+				vertexDict = self.graphDict[names[vertex]]
+				if names[edge] in vertexDict:
+					continue
+
+				# An edge between two vertices needs room for its opposite edge in a bidirectional graph
+				twoEdges = bidirectional and vertex != edge
+				if noCreated + (2 if twoEdges else 1) > noEdges:
+					continue
+
+				weight = rng.randint(weightMinimum, weightMaximum)
+				vertexDict[names[edge]] = weight
+				noCreated += 1
+
+				if twoEdges:
+					self.graphDict[names[edge]][names[vertex]] = weight
+					noCreated += 1
+
+				if noCreated == noEdges:
+					break
+
+			# The heaviest vertices saturate first, so give up if rounds stop finding new edges
+			failedRounds = failedRounds + 1 if noCreated == createdBefore else 0
+			if failedRounds == 100:
+				raise Exception("Too many edges for a power law graph of this size")
+
+		self.generateEdges()
 
 	@property 
 	def totalWeight(self):
@@ -142,20 +391,17 @@ class Graph():
 		If two nodes already share two edges then the weights will remain as they were originally
 		"""
 
-		# If not already bidirectional
-		if not self.bidirectional:
+		# If not already bidirectional, the count of unmatched edges is current unless a rebuild is pending
+		if self.stale or self.unmatchedEdges > 0:
 
-			# For each edge
-			for vertex, edgeDict in self.graphDict.items():
-				for edge, weight in edgeDict.items():
+			# For each edge, copied as the graph dictionary changes while adding edges
+			for vertex, edge in [(v, e) for v, edgeDict in self.graphDict.items() for e in edgeDict.keys()]:
 
-					# If the opposite direction edge doesn't already exist
-					if vertex not in self.graphDict[edge].keys():
+				# If the opposite direction edge doesn't already exist
+				if vertex not in self.graphDict[edge]:
 
-						# Add the opposite direction edge
-						self.graphDict[edge][vertex] = weight
-					
-			self.generateEdges()
+					# Add the opposite direction edge
+					self.linkEdge(edge, vertex, self.graphDict[vertex][edge])
 
 	@property
 	def vertices(self):
@@ -169,18 +415,13 @@ class Graph():
 		"""
 
 		# If the vertex exists
-		if vertex in self.vertices:
+		if vertex in self.graphDict:
 
 			if inOutBoth == "OUT":
 				return len(self.graphDict[vertex])
 
 			elif inOutBoth == "IN":
-				count = 0
-				for v in self.graphDict.values():
-					if vertex in v.keys():
-						count += 1
-
-				return count 
+				return len(self.reverseDict[vertex])
 
 			elif inOutBoth == "BOTH":
 				if self.bidirectional: return self.degreeOf(vertex, "OUT")
@@ -192,38 +433,97 @@ class Graph():
 	def generateEdges(self):
 		"""
 		Generate the edges of the graph
-		Each bidirectional edge will appear twice in the list, for example ('a', 'b') and ('b', 'a')
+		Each bidirectional edge will appear twice in the set, for example ('a', 'b') and ('b', 'a')
 		However unidirectional edges will appear only once
+		Also rebuilds the reverse index of edges into each vertex and tests whether the graph is bidirectional
+		Inside a batch the rebuild is deferred until the batch exits
+		Listeners are told that the whole graph has changed
 		"""
 
-		self.edges = []
+		self.version += 1
+
+		if self.batchDepth > 0:
+			self.stale = True
+		else:
+			self.rebuildEdges()
+
+		self.notify(None, None)
+
+	def rebuildEdges(self):
+		"""Rebuild the edge set, the reverse index and the bidirectional count from the graph dictionary"""
+
+		graphDict = self.graphDict
+		edges = set()
+		reverseDict = {vertex : {} for vertex in graphDict.keys()}
+		unmatchedEdges = 0
+
+		# Build everything in one pass over the edges
+		for vertex, edgeDict in graphDict.items():
+			edges.update((vertex, edge) for edge in edgeDict.keys())
+			for edge, weight in edgeDict.items():
+				reverseDict[edge][vertex] = weight
+				if vertex not in graphDict[edge]:
+					unmatchedEdges += 1
 
-		for vertex in self.graphDict.keys():
-			for edge in self.graphDict[vertex].keys():
-				self.edges.append((vertex, edge))
+		self.stale = False
+		self.edges = edges
+		self.reverseDict = reverseDict
+		self.unmatchedEdges = unmatchedEdges
+		self.bidirectional = unmatchedEdges == 0
 
 	def edgeWeight(self, vertex, edge):
 		"""Get the weight of an edge from vertex to edge"""
 
 		try:
 			return self.graphDict[vertex][edge]
-		except IndexError:
+		except KeyError:
 			raise Exception("No such edge")
 
+	def coordinatesOf(self, vertex):
+		"""Get the coordinates of a vertex"""
+
+		try:
+			return self.coordinates[vertex]
+		except KeyError:
+			raise Exception("No coordinates for vertex")
+
+	def setCoordinates(self, vertex, point):
+		"""Set the coordinates of a vertex, such as (x, y) or (latitude, longitude)"""
+
+		if vertex not in self.graphDict:
+			raise Exception("No such vertex")
+
+		self.version += 1
+		self.coordinates[vertex] = tuple(point)
+
+	@property
+	def hasCoordinates(self):
+		"""Whether every vertex has coordinates"""
+		return len(self.graphDict) > 0 and all(vertex in self.coordinates for vertex in self.graphDict.keys())
+
 	def edgesOf(self, vertex):
 		"""Get a list of all the destinations of the edges leaving a vertex"""
 
 		# if the vertex exists
-		if vertex in self.vertices:
+		if vertex in self.graphDict:
 			return list(self.graphDict[vertex].keys())
 		else:
 			raise Exception("No such vertex")
 
+	def reverseEdgesOf(self, vertex):
+		"""Get a list of all the sources of the edges entering a vertex"""
+
+		# if the vertex exists
+		if vertex in self.graphDict:
+			return list(self.reverseDict[vertex].keys())
+		else:
+			raise Exception("No such vertex")
+
 	def sortedEdgesOf(self, vertex):
 		"""Get a list of all the destinations of the edges leaving a vertex, ordered by ascending edge weight"""
 
 		# If the vertex exists
-		if vertex in self.vertices:
+		if vertex in self.graphDict:
 			return list({k: v for k, v in sorted(self.graphDict[vertex].items(), key=lambda item: item[1])}.keys())
 		else:
 			raise Exception("No such vertex")
@@ -231,7 +531,7 @@ class Graph():
 	@property
 	def noVertices(self):
 		"""The number of vertices in the graph"""
-		return len(self.vertices)
+		return len(self.graphDict)
 
 	@property
 	def noEdges(self):
@@ -241,21 +541,26 @@ class Graph():
 		"""
 		return len(self.edges)
 
-	def addVertex(self, vertex, edges):
+	def addVertex(self, vertex, edges, coordinates = None):
 		"""
 		Check that the vertex is not already in the graph
 		Check that the edge destinations are all in the graph
-		Add the new vertex to the graph dictionary
-		Regenerate the edges
+		Add the new vertex to the graph dictionary, with its coordinates if given
+		Add each edge in both directions
 		"""
 
-		if vertex not in self.graphDict.keys():
-			if all(edge in self.graphDict.keys() or edge == vertex for edge in edges.keys()):
-				self.graphDict[vertex] = edges
-				for edge in edges.keys():
-					self.graphDict[edge][vertex] = edges[edge]
+		if vertex not in self.graphDict:
+			if all(edge in self.graphDict or edge == vertex for edge in edges.keys()):
+				self.version += 1
+				self.graphDict[vertex] = {}
+				if not self.stale:
+					self.reverseDict[vertex] = {}
+				if coordinates is not None:
+					self.coordinates[vertex] = tuple(coordinates)
+				for edge, weight in edges.items():
+					self.linkEdge(vertex, edge, weight)
+					self.linkEdge(edge, vertex, weight)
 
-				self.generateEdges()
 			else:
 				raise Exception("Edge destination not in graph")
 		else:
@@ -268,30 +573,39 @@ class Graph():
 		"""
 
 		# If both vertices exist
-		if vertex1 in self.vertices and vertex2 in self.vertices:
+		if vertex1 in self.graphDict and vertex2 in self.graphDict:
 
-			self.graphDict[vertex1][vertex2] = weight
+			self.linkEdge(vertex1, vertex2, weight)
 
 			if bidrectional:
-				self.graphDict[vertex2][vertex1] = weight
-			
-			self.generateEdges()
+				self.linkEdge(vertex2, vertex1, weight)
 
 	def removeVertex(self, vertex):
 		"""Remove a given vertex from the graph"""
 
-		# Remove any edges going into the vertex
-		for v in self.vertices:
-			if v != vertex:
-				try:
-					del self.graphDict[v][vertex]
-				except:
-					pass
+		if vertex not in self.graphDict:
+			raise Exception("No such vertex")
+
+		# The reverse index is needed below, so a rebuild deferred by a batch cannot wait
+		if self.stale:
+			self.rebuildEdges()
+
+		# Remove any edges going into the vertex, found through the reverse index
+		for v in list(self.reverseDict[vertex].keys()):
+			self.unlinkEdge(v, vertex)
+
+		# Remove any edges leaving the vertex
+		for edge in list(self.graphDict[vertex].keys()):
+			self.unlinkEdge(vertex, edge)
 
 		# Remove the vertex itself
+		self.version += 1
 		del self.graphDict[vertex]
+		del self.reverseDict[vertex]
+		self.coordinates.pop(vertex, None)
 
-		self.generateEdges()
+		# Listeners holding state for the vertex itself are told it is gone, even if it had no edges left to remove
+		self.notify(vertex, None)
 
 	def removeEdge(self, vertex, edgeDestination):
 		"""
@@ -299,11 +613,10 @@ class Graph():
 		If the edge does not exist it will print "No such edge"
 		"""
 
-		try:
-			del self.graphDict[vertex][edgeDestination]
-			self.generateEdges()
-		except:
+		if vertex not in self.graphDict or edgeDestination not in self.graphDict[vertex]:
 			raise Exception("No such edge")
 
+		self.unlinkEdge(vertex, edgeDestination)
+
 	def __str__(self):
 		return f"A graph with {self.noVertices} vertices and {self.noEdges} edges"
\ No newline at end of file
@@ -2,52 +2,71 @@
 # Explores the node that is the closest to the goal, in terms of the heuristic function
 # Takes in a graph, start vertex, goal vertex and heuristic function and finds a path from the start vertex to the goal vertex
 # The heuristic function must take (vertex, graph, start, goal) as its arguments
+# If it also has an estimates method, as a CachedHeuristic does, the children of each vertex are estimated together in one call
 # Returns the path and cost
 
-from Graphs import Graph, loadGraph
+from Graphs import Graph, NoPathError, loadGraph, reconstructPath, pathCost
+from PriorityQueue import IndexedPriorityQueue
 
 from datetime import datetime as dt 
 from time import sleep
 
-def greedyBestFirstSearch(graph, start, goal, heuristic):
+def greedyBestFirstSearch(graph, start, goal, heuristic, stats = None):
+	"""
+	Given a graph, start node, goal node and heuristic function, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded and generated and the heuristic calls are recorded in it
+	"""
 
-	frontier = [(start, heuristic(start, graph, start, goal))]
-	explored = []
-	paths = {start : [start]}
+	frontier = IndexedPriorityQueue()
+	frontier.push(start, heuristic(start, graph, start, goal))
+	explored = set()
+	parents = {start : None}
+	batchHeuristic = getattr(heuristic, 'estimates', None)
+
+	if stats is not None:
+		stats.heuristicCalls += 1
 
 	# While the frontier is not empty, until the goal has been found
 	while True:
 
 		if len(frontier) == 0:
-			raise Exception(f"No path exists between {start} and {goal}")
-
-		# Sort by the heuristic cost of each vertex
-		frontier.sort(key=lambda tup: tup[1])
+			raise NoPathError(f"No path exists between {start} and {goal}")
 
-		# Get the next vertex to explore
-		vertex = frontier.pop(0)[0]
+		# Get the next vertex to explore, the one with the lowest heuristic cost
+		vertex, _ = frontier.pop()
 
 		# If the vertex is the goal
 		if vertex == goal:
 
-			# Calculate the cost of the path
-			cost = 0
-			for i in range(len(paths[vertex])-1):
-				cost += graph.edgeWeight(paths[vertex][i], paths[vertex][i+1])
+			# Rebuild the path and calculate its cost
+			solution = reconstructPath(parents, vertex)
+			return (solution, pathCost(graph, solution))
+
+		if stats is not None:
+			stats.expand(vertex)
+
+		# Every child that has not been discovered, except through a loop
+		children = [child for child in graph.edgesOf(vertex) if child != vertex and child not in frontier and child not in explored]
+
+		# Estimate all of the children in one call if the heuristic can
+		if batchHeuristic is not None:
+			estimates = batchHeuristic(children, graph, start, goal)
+		else:
+			estimates = [heuristic(child, graph, start, goal) for child in children]
 
-			return (paths[vertex], cost)
+		if stats is not None:
+			stats.heuristicCalls += len(children)
 
-		# For each edge of the vertex
-		for child in graph.edgesOf(vertex):
+		for child, estimate in zip(children, estimates):
 
-			# If the child has not been discovered and the edge is not a loop
-			if child != vertex and child not in [f[0] for f in frontier] and child not in explored:
+			# Add the child to the frontier and store it's parent
+			frontier.push(child, estimate)
+			parents[child] = vertex
 
-				# Add the child to the frontier and store it's path
-				frontier.append((child, heuristic(child, graph, start, goal)))
-				paths[child] = paths[vertex] + [child]
+			if stats is not None:
+				stats.generate(child, vertex, len(frontier))
 
-		explored.append(vertex)
+		explored.add(vertex)
 
 def heuristic(vertex, graph, start, goal):
 	"""
@@ -0,0 +1,102 @@
+# Memoization of heuristic functions for the informed searches (A*, greedy best first search and IDA*)
+# A CachedHeuristic wraps a heuristic taking (vertex, graph, start, goal) and remembers the estimate of each (vertex, goal) pair
+# so an expensive heuristic is evaluated once per vertex rather than once each time the vertex is generated
+# Keep the same CachedHeuristic for a batch of queries to share estimates between them, and clear it when the batch is over
+# Estimates are assumed not to depend on the start vertex, and they are discarded once the graph changes
+# A heuristic can also have a batched form taking a list of vertices and returning a sequence of estimates,
+# the searches use it through the estimates method to estimate every child of an expanded vertex in one call
+
+import weakref
+
+class CachedHeuristic():
+
+	def __init__(self, heuristic = None, batchHeuristic = None):
+		"""
+		Creates a new empty cache in front of a heuristic
+		heuristic(vertex, graph, start, goal) returns the estimate of a single vertex
+		batchHeuristic(vertices, graph, start, goal) returns a sequence holding the estimate of each vertex in the list
+		At least one must be given, if only one is given the other form is built from it
+		"""
+
+		if heuristic is None and batchHeuristic is None:
+			raise Exception("A heuristic or batch heuristic must be given")
+
+		self.heuristic = heuristic
+		self.batchHeuristic = batchHeuristic
+
+		# Use the batched form of a heuristic which has one, such as a LandmarkHeuristic
+		if self.batchHeuristic is None:
+			self.batchHeuristic = getattr(heuristic, 'estimates', None)
+
+		# The estimates of each goal as {goal : {vertex : estimate}}
+		self.values = {}
+		self.graphReference = None
+		self.version = None
+
+		self.hits = 0
+		self.misses = 0
+
+	def valuesFor(self, graph, goal):
+		"""The estimates already made for a goal, emptying the cache first if the graph has changed"""
+
+		if self.graphReference is None or self.graphReference() is not graph or self.version != graph.version:
+			self.values = {}
+			self.graphReference = weakref.ref(graph)
+			self.version = graph.version
+
+		values = self.values.get(goal)
+		if values is None:
+			values = self.values[goal] = {}
+
+		return values
+
+	def __call__(self, vertex, graph, start, goal):
+		"""The estimate of the cost from vertex to goal, evaluating the heuristic only if it hasn't been before"""
+
+		values = self.valuesFor(graph, goal)
+		estimate = values.get(vertex)
+
+		if estimate is None:
+			self.misses += 1
+			if self.heuristic is not None:
+				estimate = self.heuristic(vertex, graph, start, goal)
+			else:
+				estimate = self.batchHeuristic([vertex], graph, start, goal)[0]
+			values[vertex] = estimate
+		else:
+			self.hits += 1
+
+		return estimate
+
+	def estimates(self, vertices, graph, start, goal):
+		"""The estimates of the cost from each of the vertices to goal as a list, evaluating the heuristic once for all those not already cached"""
+
+		values = self.valuesFor(graph, goal)
+		missing = [vertex for vertex in vertices if vertex not in values]
+
+		self.misses += len(missing)
+		self.hits += len(vertices) - len(missing)
+
+		if len(missing) > 0:
+			if self.batchHeuristic is not None:
+				values.update(zip(missing, self.batchHeuristic(missing, graph, start, goal)))
+			else:
+				for vertex in missing:
+					values[vertex] = self.heuristic(vertex, graph, start, goal)
+
+		return [values[vertex] for vertex in vertices]
+
+	def clear(self):
+		"""Remove every estimate and reset the counters"""
+
+		self.values = {}
+		self.graphReference = None
+		self.version = None
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return sum(len(values) for values in self.values.values())
+
+	def __str__(self):
+		return f"A heuristic cache holding {len(self)} estimates with {self.hits} hits and {self.misses} misses"
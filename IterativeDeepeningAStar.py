@@ -1,30 +1,123 @@
 # An implementation of the iterative deepening A* (IDA*) search algorithm
-# IDA* performs A* search with a limit on the (cost + heuristic)
+# IDA* performs depth first search with a limit on the (cost + heuristic), only keeping the current path in memory
+# When a search fails the limit jumps to the smallest (cost + heuristic) that exceeded it
 # Takes in a graph, start vertex, goal vertex and heuristic function and finds a path from the start vertex to the goal vertex
 # The heuristic function must take (vertex, graph, start, goal) as its arguments
+# Each iteration revisits the vertices of the one before, so the heuristic is wrapped in a CachedHeuristic to evaluate it once per vertex
 # Returns the path and cost
 
-from Graphs import Graph, loadGraph
-from AStar import AStarSearch
+from Graphs import Graph, NoPathError, loadGraph
+from HeuristicCache import CachedHeuristic
+from math import inf
 
-def iterativeDeepeningAStarSearch(graph, start, goal, heuristic):
+def iterativeDeepeningAStarSearch(graph, start, goal, heuristic, stats = None):
+	"""
+	Given a graph, start node, goal node and heuristic function, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded and generated and the heuristic calls are recorded in it,
+	along with the number of iterations and the number of vertices expanded in each iteration
+	The heuristic calls recorded are those made by the search, however many the cache answered
+	"""
+
+	# Cache the estimates for this query unless the heuristic is already cached, possibly for a batch of queries
+	if not isinstance(heuristic, CachedHeuristic):
+		heuristic = CachedHeuristic(heuristic)
+
+	limit = heuristic(start, graph, start, goal)
+
+	if stats is not None:
+		stats.heuristicCalls += 1
+
+	# Search with the current limit, raising it to the next candidate limit until a path is found
+	while True:
+
+		solution, nextLimit, noExpanded = boundedSearch(graph, start, goal, heuristic, limit, stats)
+
+		if stats is not None:
+			stats.iterations += 1
+			stats.expandedPerIteration.append(noExpanded)
+
+		if solution is not None:
+			return solution
+
+		# If nothing exceeded the limit then the whole reachable graph was searched
+		if nextLimit == inf:
+			raise NoPathError(f"No path exists between {start} and {goal}")
+
+		limit = nextLimit
+
+def boundedSearch(graph, start, goal, heuristic, limit, stats = None):
+	"""
+	Depth first search from start that only follows vertices whose (cost + heuristic) doesn't exceed limit
+	Vertices already on the current path are skipped so cycles are never followed
+	If a SearchStats is given the vertices expanded and generated and the heuristic calls are recorded in it
+	Returns the (path, cost) if found, otherwise None, along with the smallest (cost + heuristic) above limit and the number of vertices expanded
+	"""
+
+	nextLimit = heuristic(start, graph, start, goal)
+
+	if stats is not None:
+		stats.heuristicCalls += 1
+
+	if nextLimit > limit:
+		return None, nextLimit, 0
+
+	if start == goal:
+		return ([start], 0), inf, 0
+
+	nextLimit = inf
+
+	# The current path, the cost to each vertex along it and an iterator over the remaining children of each
+	path = [start]
+	onPath = {start}
+	costs = [0]
+	children = [iter(graph.edgesOf(start))]
+	noExpanded = 1
+
+	if stats is not None:
+		stats.expand(start)
+
+	while len(children) > 0:
+
+		child = next(children[-1], None)
+
+		# If every child has been searched then backtrack
+		if child is None:
+			children.pop()
+			costs.pop()
+			onPath.discard(path.pop())
+			continue
+
+		# Skip loops and cycles back onto the current path
+		if child in onPath:
+			continue
+
+		cost = costs[-1] + graph.edgeWeight(path[-1], child)
+		f = cost + heuristic(child, graph, start, goal)
+
+		if stats is not None:
+			stats.heuristicCalls += 1
 
-	limit = 1
-	totalWeight = graph.totalWeight
+		# If the limit is exceeded keep track of the smallest value that exceeded it
+		if f > limit:
+			if f < nextLimit:
+				nextLimit = f
+			continue
 
-	# Increment the limit value until it reaches the total weight of the graph
-	while limit < graph.totalWeight:
+		if child == goal:
+			return (path + [child], cost), nextLimit, noExpanded
 
-		# Perform A* with the current limit and return the solution and cost if found
-		# If a solution is not found it throws an exception
-		try:
-			return AStarSearch(graph, start, goal, heuristic, limit)
+		# Move deeper into the child
+		path.append(child)
+		onPath.add(child)
+		costs.append(cost)
+		children.append(iter(graph.edgesOf(child)))
+		noExpanded += 1
 
-		# Increment the limit
-		except:
-			limit += 1
+		if stats is not None:
+			stats.generate(child, path[-2], len(path))
+			stats.expand(child)
 
-	raise Exception(f"No path exists between {start} and {goal}")
+	return None, nextLimit, noExpanded
 
 def heuristic(vertex, graph, start, goal):
 	"""
@@ -1,29 +1,97 @@
 # Implementation of the iterative deepending depth first search (IDDF) algorithm
 # IDDF performs limited depth first with an increasing depth limit
+# Each depth limited search only keeps the current path in memory and stops increasing the limit once no vertex was cut off by it
 # Takes in a graph, start vertex and goal vertex and finds a path from the start vertex to the goal vertex
 # Returns the path and cost
 
-from Graphs import Graph, loadGraph
-from DepthFirst import depthFirstSearch
+from Graphs import Graph, NoPathError, loadGraph, pathCost
+from collections import namedtuple
 
-def iterativeDeepeningDepthFirstSearch(graph, start, goal):
+# The result of a depth limited search
+# path is the path found or None, cutoff is True if any vertex was not expanded because of the depth limit
+DepthLimitedResult = namedtuple('DepthLimitedResult', ['path', 'cutoff'])
 
-	limit = 1
-	noVertices = graph.noVertices
+def iterativeDeepeningDepthFirstSearch(graph, start, goal, stats = None):
+	"""
+	Given a graph, start node and goal node, this function returns a solution path and cost
+	If a SearchStats is given the vertices expanded and generated are recorded in it, along with the number of iterations
+	and the number of vertices expanded in each iteration
+	"""
 
-	# Increment the limit while it is less than the total number of vertices in the graph
-	while limit < graph.noVertices:
+	limit = 0
 
-		# Perform depth first search with the current limit and return the solution and cost is found
-		# If a solution is not found it throws an exception
-		try:
-			return depthFirstSearch(graph, start, goal, limit)
+	# Increment the limit until a path is found or the limit no longer cuts off any vertex
+	while True:
 
-		# Increment the limit
-		except:
-			limit += 1
+		expandedBefore = stats.nodesExpanded if stats is not None else 0
+		result = depthLimitedSearch(graph, start, goal, limit, stats)
 
-	raise Exception(f"No path exists between {start} and {goal}")
+		if stats is not None:
+			stats.iterations += 1
+			stats.expandedPerIteration.append(stats.nodesExpanded - expandedBefore)
+
+		if result.path is not None:
+			return (result.path, pathCost(graph, result.path))
+
+		if not result.cutoff:
+			raise NoPathError(f"No path exists between {start} and {goal}")
+
+		limit += 1
+
+def depthLimitedSearch(graph, start, goal, limit, stats = None):
+	"""
+	Depth first search from start following at most limit edges
+	Vertices already on the current path are skipped so cycles are never followed
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	Returns a DepthLimitedResult
+	"""
+
+	if start == goal:
+		return DepthLimitedResult([start], False)
+
+	if limit == 0:
+		return DepthLimitedResult(None, len(graph.edgesOf(start)) > 0)
+
+	# The current path and an iterator over the remaining children of each vertex on it
+	path = [start]
+	onPath = {start}
+	children = [iter(graph.edgesOf(start))]
+	cutoff = False
+
+	if stats is not None:
+		stats.expand(start)
+
+	while len(children) > 0:
+
+		child = next(children[-1], None)
+
+		# If every child has been searched then backtrack
+		if child is None:
+			children.pop()
+			onPath.discard(path.pop())
+			continue
+
+		# Skip loops and cycles back onto the current path
+		if child in onPath:
+			continue
+
+		if child == goal:
+			return DepthLimitedResult(path + [child], cutoff)
+
+		# If the child is at the depth limit it is not expanded
+		if len(path) == limit:
+			cutoff = True
+			continue
+
+		path.append(child)
+		onPath.add(child)
+		children.append(iter(graph.edgesOf(child)))
+
+		if stats is not None:
+			stats.generate(child, path[-2], len(path))
+			stats.expand(child)
+
+	return DepthLimitedResult(None, cutoff)
 
 if __name__ == '__main__':
 	
@@ -0,0 +1,151 @@
+# Landmark (ALT) heuristic for the A* search algorithm
+# A small number of landmark vertices are chosen and the shortest path costs from and to every landmark are computed once
+# By the triangle inequality, for any landmark L:
+#	cost(vertex, goal) >= cost(L, goal) - cost(L, vertex)
+#	cost(vertex, goal) >= cost(vertex, L) - cost(goal, L)
+# The largest of these lower bounds over all landmarks is an admissible heuristic on any graph with non negative weights
+# The heuristic takes (vertex, graph, start, goal) as its arguments so it can be passed straight to AStarSearch
+
+from UniformCost import uniformCostTree
+from array import array
+from math import inf
+import random
+import json
+
+class LandmarkHeuristic():
+
+	def __init__(self, vertices, landmarks, fromLandmarks, toLandmarks):
+		"""
+		Creates a heuristic from already computed tables
+		fromLandmarks[k][i] is the cost from landmarks[k] to vertices[i], toLandmarks[k][i] is the cost from vertices[i] to landmarks[k]
+		Unreachable vertices have a cost of inf
+		Use precompute or load rather than calling this directly
+		"""
+
+		self.vertices = vertices
+		self.index = {vertex : i for i, vertex in enumerate(vertices)}
+		self.landmarks = landmarks
+		self.fromLandmarks = fromLandmarks
+		self.toLandmarks = toLandmarks
+
+	@classmethod
+	def precompute(cls, graph, noLandmarks, method = "FARTHEST", seed = None):
+		"""
+		Choose noLandmarks landmarks and compute their cost tables
+		method is either "FARTHEST", where each landmark is the vertex farthest from the landmarks already chosen, or "RANDOM"
+		"""
+
+		vertices = graph.vertices
+
+		if noLandmarks < 1 or noLandmarks > len(vertices):
+			raise Exception("Number of landmarks must be between 1 and the number of vertices")
+
+		if method not in ["FARTHEST", "RANDOM"]:
+			raise Exception(f"Unknown landmark selection method {method}")
+
+		rng = random.Random(seed)
+		heuristic = cls(vertices, [], [], [])
+
+		if method == "RANDOM":
+			for landmark in rng.sample(vertices, noLandmarks):
+				heuristic.addLandmark(graph, landmark)
+			return heuristic
+
+		# Start from the vertex farthest from a random vertex
+		closest = heuristic.costTable(graph, rng.choice(vertices), False)
+
+		while len(heuristic.landmarks) < noLandmarks:
+
+			# Pick the vertex farthest from its closest landmark, a vertex no landmark reaches is the farthest of all
+			candidates = [i for i in range(len(vertices)) if vertices[i] not in heuristic.landmarks]
+			landmark = vertices[max(candidates, key = lambda i: closest[i])]
+			heuristic.addLandmark(graph, landmark)
+
+			closest = array('d', map(min, closest, heuristic.fromLandmarks[-1]))
+
+		return heuristic
+
+	def costTable(self, graph, landmark, reverse):
+		"""The cost from the landmark to every vertex, or from every vertex to the landmark if reverse is True"""
+
+		costs, _ = uniformCostTree(graph, landmark, reverse = reverse)
+		return array('d', [costs.get(vertex, inf) for vertex in self.vertices])
+
+	def addLandmark(self, graph, landmark):
+		"""Compute the cost tables of another landmark"""
+
+		self.landmarks.append(landmark)
+		self.fromLandmarks.append(self.costTable(graph, landmark, False))
+		self.toLandmarks.append(self.costTable(graph, landmark, True))
+
+	def __call__(self, vertex, graph, start, goal):
+		"""The largest lower bound on the cost from vertex to goal given by any landmark"""
+
+		i = self.index[vertex]
+		j = self.index[goal]
+		estimate = 0
+
+		for fromLandmark, toLandmark in zip(self.fromLandmarks, self.toLandmarks):
+
+			# Bounds can only be taken from landmarks that reach, or are reached by, both vertices
+			if fromLandmark[i] < inf and fromLandmark[j] < inf:
+				estimate = max(estimate, fromLandmark[j] - fromLandmark[i])
+
+			if toLandmark[i] < inf and toLandmark[j] < inf:
+				estimate = max(estimate, toLandmark[i] - toLandmark[j])
+
+		return estimate
+
+	def estimates(self, vertices, graph, start, goal):
+		"""The estimate of each of the vertices as a list, the batched form of calling the heuristic on each vertex"""
+
+		j = self.index[goal]
+		indices = [self.index[vertex] for vertex in vertices]
+		estimates = [0] * len(indices)
+
+		# Go through the landmarks once for the whole batch, the goal's costs only being looked up once per landmark
+		for fromLandmark, toLandmark in zip(self.fromLandmarks, self.toLandmarks):
+
+			fromGoal = fromLandmark[j]
+			toGoal = toLandmark[j]
+
+			for k, i in enumerate(indices):
+
+				if fromGoal < inf and fromLandmark[i] < inf and fromGoal - fromLandmark[i] > estimates[k]:
+					estimates[k] = fromGoal - fromLandmark[i]
+
+				if toGoal < inf and toLandmark[i] < inf and toLandmark[i] - toGoal > estimates[k]:
+					estimates[k] = toLandmark[i] - toGoal
+
+		return estimates
+
+	def save(self, filePath):
+		"""
+		Save the tables to a file
+		The first line is a JSON header holding the vertices and landmarks, followed by the raw tables as doubles
+		"""
+
+		with open(filePath, 'wb') as fp:
+			fp.write(json.dumps({'vertices' : self.vertices, 'landmarks' : self.landmarks}).encode() + b'\n')
+			for table in self.fromLandmarks + self.toLandmarks:
+				table.tofile(fp)
+
+	@classmethod
+	def load(cls, filePath):
+		"""Load tables saved by save"""
+
+		with open(filePath, 'rb') as fp:
+
+			header = json.loads(fp.readline())
+			vertices, landmarks = header['vertices'], header['landmarks']
+
+			tables = []
+			for _ in range(2 * len(landmarks)):
+				table = array('d')
+				table.fromfile(fp, len(vertices))
+				tables.append(table)
+
+		return cls(vertices, landmarks, tables[:len(landmarks)], tables[len(landmarks):])
+
+	def __str__(self):
+		return f"A landmark heuristic with {len(self.landmarks)} landmarks over {len(self.vertices)} vertices"
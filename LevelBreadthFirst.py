@@ -0,0 +1,180 @@
+# A level synchronous breadth first search over the compressed sparse row arrays of a CompactGraph
+# Instead of one vertex at a time, each step expands the whole frontier of vertices at the current depth into the next one,
+# with the visited vertices and the frontier kept as byte maps indexed by vertex id
+# Steps are direction optimizing: a top down step follows the edges out of the frontier, while a bottom up step checks the edges
+# into each unvisited vertex until it finds one from the frontier, which is cheaper once the frontier holds much of the graph
+# The search switches to bottom up when the frontier has more edges to check than the unvisited vertices divided by ALPHA,
+# and back to top down when the frontier holds fewer than noVertices divided by BETA vertices
+# Gives the number of edges (hops) from the start to every vertex, or the path with the fewest edges to a goal
+# A Graphs.Graph is converted to a CompactGraph the first time it is searched, the conversion is reused until the graph changes
+
+from Graphs import Graph, NoPathError, loadGraph, pathCost
+from CompactGraph import CompactGraph
+from array import array
+import weakref
+
+# The switching thresholds between top down and bottom up steps, as tuned by Beamer, Asanovic and Patterson
+ALPHA = 14
+BETA = 24
+
+# The version each Graphs.Graph was at when it was last converted, and the CompactGraph it was converted to
+compactGraphs = weakref.WeakKeyDictionary()
+
+def compactGraphOf(graph):
+	"""
+	Get the CompactGraph to search for a graph, which is the graph itself if it is already one
+	A Graphs.Graph is converted once per version, so repeated searches of an unchanged graph share one conversion
+	"""
+
+	if isinstance(graph, CompactGraph):
+		return graph
+
+	entry = compactGraphs.get(graph)
+
+	if entry is None or entry[0] != graph.version:
+		entry = compactGraphs[graph] = (graph.version, CompactGraph.fromGraph(graph))
+
+	return entry[1]
+
+def levelBreadthFirstTree(graph, start, goal = None, directionOptimizing = True, stats = None):
+	"""
+	Search outwards from the start vertex a level at a time, until the goal is reached or until the whole graph has if goal is None
+	graph is converted to a CompactGraph if it isn't one, the conversion takes time linear in the size of the graph
+	but is reused by later searches until the graph changes
+	Returns the CompactGraph searched and arrays of the hops to and parent id of each vertex id, both -1 for vertices not reached
+	If directionOptimizing is False every step is top down
+	If a SearchStats is given the vertices expanded and generated are recorded in it, with an iteration for each level
+	"""
+
+	graph = compactGraphOf(graph)
+
+	noVertices = graph.noVertices
+	offsets, targets = graph.offsets, graph.targets
+	startId = graph.idOf(start)
+	goalId = graph.idOf(goal) if goal is not None else -1
+
+	# Bottom up steps need the edges into each vertex, which are the edges out of it in a bidirectional graph
+	if not directionOptimizing or graph.bidirectional:
+		reverseOffsets, sources = offsets, targets
+	else:
+		if graph.reverseOffsets is None:
+			graph.buildReverse()
+		reverseOffsets, sources = graph.reverseOffsets, graph.sources
+
+	hops = array('q', [-1]) * noVertices
+	parents = array('q', [-1]) * noVertices
+	visited = bytearray(noVertices)
+
+	hops[startId] = 0
+	visited[startId] = 1
+	frontier = [startId]
+	depth = 0
+
+	# The edges the next top down step would follow, and the edges into unvisited vertices a bottom up step could check
+	frontierEdges = offsets[startId + 1] - offsets[startId]
+	unvisitedEdges = graph.noEdges - (reverseOffsets[startId + 1] - reverseOffsets[startId])
+	bottomUp = False
+
+	while len(frontier) > 0 and not (goalId >= 0 and visited[goalId]):
+
+		depth += 1
+		expandedBefore = stats.nodesExpanded if stats is not None else 0
+
+		if directionOptimizing:
+			if not bottomUp and frontierEdges > unvisitedEdges / ALPHA:
+				bottomUp = True
+			elif bottomUp and len(frontier) < noVertices / BETA:
+				bottomUp = False
+
+		nextFrontier = []
+
+		if bottomUp:
+
+			# Mark the frontier so each unvisited vertex can check its parents against it
+			inFrontier = bytearray(noVertices)
+			for v in frontier:
+				inFrontier[v] = 1
+
+			for u in range(noVertices):
+
+				if visited[u]:
+					continue
+
+				if stats is not None:
+					stats.expand(graph.names[u])
+
+				for source in sources[reverseOffsets[u]:reverseOffsets[u + 1]]:
+					if inFrontier[source]:
+						parents[u] = source
+						nextFrontier.append(u)
+						break
+
+		else:
+
+			for v in frontier:
+
+				if stats is not None:
+					stats.expand(graph.names[v])
+
+				for t in targets[offsets[v]:offsets[v + 1]]:
+					if not visited[t]:
+						visited[t] = 1
+						parents[t] = v
+						nextFrontier.append(t)
+
+		# Bottom up steps mark the vertices found once the whole level has been checked, so the level only finds children of the frontier
+		frontierEdges = 0
+		for u in nextFrontier:
+			visited[u] = 1
+			hops[u] = depth
+			frontierEdges += offsets[u + 1] - offsets[u]
+			unvisitedEdges -= reverseOffsets[u + 1] - reverseOffsets[u]
+			if stats is not None:
+				stats.generate(graph.names[u], graph.names[parents[u]], len(nextFrontier))
+
+		if stats is not None:
+			stats.iterations += 1
+			stats.expandedPerIteration.append(stats.nodesExpanded - expandedBefore)
+
+		frontier = nextFrontier
+
+	return graph, hops, parents
+
+def hopDistances(graph, start, directionOptimizing = True, stats = None):
+	"""
+	The number of edges on the shortest path from the start vertex to every vertex, as an array indexed in the order of graph.vertices
+	Vertices that can't be reached have a distance of -1
+	"""
+
+	return levelBreadthFirstTree(graph, start, None, directionOptimizing, stats)[1]
+
+def levelBreadthFirstSearch(graph, start, goal, directionOptimizing = True, stats = None):
+	"""Given a graph, start node and goal node, this function returns the path with the fewest edges and its cost"""
+
+	compact, hops, parents = levelBreadthFirstTree(graph, start, goal, directionOptimizing, stats)
+	goalId = compact.idOf(goal)
+
+	if hops[goalId] < 0:
+		raise NoPathError(f"No path exists between {start} and {goal}")
+
+	# Rebuild the path from the parent ids
+	path = [goalId]
+	while parents[path[-1]] >= 0:
+		path.append(parents[path[-1]])
+
+	solution = [compact.names[i] for i in reversed(path)]
+	return (solution, pathCost(compact, solution))
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Start vertex?")
+	start = input("")
+	print("Goal vertex? enter nothing for the hops to every vertex")
+	goal = input("")
+
+	if goal == "":
+		print(dict(zip(graph.vertices, hopDistances(graph, start))))
+	else:
+		print(levelBreadthFirstSearch(graph, start, goal))
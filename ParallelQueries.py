@@ -0,0 +1,97 @@
+# Runs many independent searches over the same graph across several processes
+# The graph is sent to each worker process once, by fork inheritance where the platform supports it, otherwise once per worker when it starts
+# Only the search function and query arguments are sent with each task, results are streamed back in completion order
+# Any search function taking (graph, *query) can be used, for example uniformCostSearch, AStarSearch or bidirectionalSearch
+
+import multiprocessing
+from itertools import count
+
+# Graphs waiting to be inherited by forked workers, keyed by executor
+sharedGraphs = {}
+executorIds = count()
+
+# The graph used by the searches in this worker process
+workerGraph = None
+
+def initialiseWorker(key, graph):
+	"""Set the graph of a newly started worker, either inherited through sharedGraphs or sent directly"""
+
+	global workerGraph
+	workerGraph = sharedGraphs[key] if graph is None else graph
+
+def runQuery(task):
+	"""Run a single search in a worker, a failed search returns its exception rather than stopping the other queries"""
+
+	index, searchFunction, query = task
+
+	try:
+		return index, searchFunction(workerGraph, *query)
+	except Exception as e:
+		return index, e
+
+class QueryExecutor():
+
+	def __init__(self, graph, processes = None):
+		"""
+		Creates a pool of worker processes that each hold the given graph
+		processes defaults to the number of CPUs
+		"""
+
+		self.key = next(executorIds)
+
+		if 'fork' in multiprocessing.get_all_start_methods():
+
+			# Forked workers inherit the graph from this process without it being pickled
+			sharedGraphs[self.key] = graph
+			context = multiprocessing.get_context('fork')
+			self.pool = context.Pool(processes, initialiseWorker, (self.key, None))
+
+		else:
+
+			# Each worker receives the graph once as it starts
+			self.pool = multiprocessing.Pool(processes, initialiseWorker, (self.key, graph))
+
+	def imap(self, searchFunction, queries, chunksize = 1):
+		"""
+		Run searchFunction(graph, *query) for each query, yielding (index, result) in the order the searches finish
+		index is the position of the query in queries
+		result is the (path, cost) returned by the search, or the exception it raised
+		"""
+
+		tasks = ((index, searchFunction, tuple(query)) for index, query in enumerate(queries))
+
+		for index, result in self.pool.imap_unordered(runQuery, tasks, chunksize):
+			yield index, result
+
+	def map(self, searchFunction, queries, chunksize = 1):
+		"""Run searchFunction(graph, *query) for each query, returning a list of results in the same order as queries"""
+
+		queries = list(queries)
+		results = [None] * len(queries)
+
+		for index, result in self.imap(searchFunction, queries, chunksize):
+			results[index] = result
+
+		return results
+
+	def submit(self, searchFunction, query, callback):
+		"""
+		Start searchFunction(graph, *query) in a worker without waiting for it
+		callback(result) is called with the result or the exception raised once the search finishes, from a thread of the pool
+		It is also called with the exception if the task can't be sent to a worker, for example when the search or its arguments can't be pickled
+		"""
+
+		self.pool.apply_async(runQuery, ((0, searchFunction, tuple(query)),), callback = lambda indexedResult: callback(indexedResult[1]), error_callback = callback)
+
+	def close(self):
+		"""Stop the worker processes"""
+
+		self.pool.terminate()
+		self.pool.join()
+		sharedGraphs.pop(self.key, None)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
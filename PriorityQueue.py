@@ -0,0 +1,147 @@
+# An indexed binary heap priority queue used as the frontier of the cost ordered searches
+# Each item is stored at most once, its position in the heap is tracked so membership is O(1) and its priority can be changed or it can be removed in O(log n)
+# Items with equal priority are popped in the order they were pushed, a decrease-key counts as a new push
+# This matches the stable sort then pop(0) order the searches used originally
+
+class IndexedPriorityQueue():
+
+	def __init__(self):
+		"""Creates a new empty priority queue"""
+
+		# The heap is stored as a list of [priority, sequence number, item]
+		self.heap = []
+		self.positions = {}
+		self.counter = 0
+
+	def __len__(self):
+		return len(self.heap)
+
+	def __contains__(self, item):
+		return item in self.positions
+
+	def __getitem__(self, item):
+		"""Get the priority of an item in the queue"""
+		return self.heap[self.positions[item]][0]
+
+	def push(self, item, priority):
+		"""Add a new item to the queue with the given priority"""
+
+		if item in self.positions:
+			raise Exception(f"{item} is already in the queue")
+
+		self.heap.append([priority, self.counter, item])
+		self.counter += 1
+		self.positions[item] = len(self.heap) - 1
+		self.siftUp(len(self.heap) - 1)
+
+	def peek(self):
+		"""Get the (item, priority) with the lowest priority without removing it"""
+
+		if len(self.heap) == 0:
+			raise Exception("Priority queue is empty")
+
+		priority, _, item = self.heap[0]
+		return item, priority
+
+	def pop(self):
+		"""Remove and return the (item, priority) with the lowest priority"""
+
+		if len(self.heap) == 0:
+			raise Exception("Priority queue is empty")
+
+		priority, _, item = self.heap[0]
+		last = self.heap.pop()
+		del self.positions[item]
+
+		# Move the last entry into the root and restore the heap order
+		if len(self.heap) > 0:
+			self.heap[0] = last
+			self.positions[last[2]] = 0
+			self.siftDown(0)
+
+		return item, priority
+
+	def decreaseKey(self, item, priority):
+		"""Lower the priority of an item already in the queue"""
+
+		index = self.positions[item]
+
+		if priority > self.heap[index][0]:
+			raise Exception("New priority is greater than the current priority")
+
+		self.heap[index][0] = priority
+		self.heap[index][1] = self.counter
+		self.counter += 1
+		self.siftUp(index)
+
+	def update(self, item, priority):
+		"""Change the priority of an item already in the queue, whether it rises or falls"""
+
+		index = self.positions[item]
+		entry = self.heap[index]
+		raised = priority > entry[0]
+
+		entry[0] = priority
+		entry[1] = self.counter
+		self.counter += 1
+
+		if raised:
+			self.siftDown(index)
+		else:
+			self.siftUp(index)
+
+	def remove(self, item):
+		"""Remove an item from anywhere in the queue"""
+
+		index = self.positions.pop(item)
+		last = self.heap.pop()
+
+		# Move the last entry into the gap and restore the heap order in whichever direction it is broken
+		if index < len(self.heap):
+			self.heap[index] = last
+			self.positions[last[2]] = index
+			self.siftDown(index)
+			self.siftUp(self.positions[last[2]])
+
+	def siftUp(self, index):
+		"""Move the entry at index towards the root until its parent is not greater than it"""
+
+		heap = self.heap
+		entry = heap[index]
+
+		while index > 0:
+			parent = (index - 1) >> 1
+			above = heap[parent]
+			if above[0] < entry[0] or (above[0] == entry[0] and above[1] < entry[1]):
+				break
+			heap[index] = heap[parent]
+			self.positions[heap[index][2]] = index
+			index = parent
+
+		heap[index] = entry
+		self.positions[entry[2]] = index
+
+	def siftDown(self, index):
+		"""Move the entry at index away from the root until neither child is less than it"""
+
+		heap = self.heap
+		size = len(heap)
+		entry = heap[index]
+
+		while True:
+			child = 2 * index + 1
+			if child >= size:
+				break
+			if child + 1 < size:
+				left, right = heap[child], heap[child + 1]
+				if right[0] < left[0] or (right[0] == left[0] and right[1] < left[1]):
+					child += 1
+			below = heap[child]
+			if entry[0] < below[0] or (entry[0] == below[0] and entry[1] < below[1]):
+				break
+			heap[index] = heap[child]
+			self.positions[heap[index][2]] = index
+			index = child
+
+		heap[index] = entry
+		self.positions[entry[2]] = index
@@ -0,0 +1,108 @@
+# An opt-in cache of search results for repeated (start, goal) queries
+# Results are keyed on the search function, the graph, the endpoints and any further arguments such as the heuristic function or limit
+# A stats keyword argument is left out of the key, it records the work of searches that miss the cache and nothing for hits
+# The least recently used results are evicted once the cache is full, and results can optionally expire after a time to live
+# Each result remembers the version of the graph it was computed on, so a result is discarded once the graph has changed
+
+from collections import OrderedDict
+from time import monotonic
+import weakref
+
+def copyResult(result):
+	"""
+	Copy a search result with a new list for its path, which comes first
+	Named tuple results, such as a MultiSearchResult, keep their type
+	"""
+
+	if hasattr(result, '_replace'):
+		return result._replace(**{result._fields[0] : list(result[0])})
+
+	return (list(result[0]),) + tuple(result[1:])
+
+class SearchCache():
+
+	def __init__(self, maxSize = 1024, timeToLive = None):
+		"""
+		Creates a new empty cache holding at most maxSize results
+		If timeToLive is given results older than that many seconds are not reused
+		"""
+
+		if maxSize < 1:
+			raise Exception("Cache must hold at least one result")
+
+		self.maxSize = maxSize
+		self.timeToLive = timeToLive
+		self.results = OrderedDict()
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def search(self, searchFunction, graph, start, goal, *args, **kwargs):
+		"""
+		Return searchFunction(graph, start, goal, *args, **kwargs), reusing a cached result where possible
+		Failed searches raise their exception as usual and are not cached
+		"""
+
+		key = (searchFunction, id(graph), start, goal, args, tuple(sorted((name, value) for name, value in kwargs.items() if name != 'stats')))
+
+		try:
+			entry = self.results.get(key)
+		except TypeError:
+			# Arguments that can't be hashed, such as a dictionary, can't be cached
+			self.misses += 1
+			return searchFunction(graph, start, goal, *args, **kwargs)
+
+		if entry is not None:
+
+			graphReference, version, created, result = entry
+
+			# Only reuse a result computed on this same graph, at its current version, that hasn't expired
+			if graphReference() is graph and version == graph.version and (self.timeToLive is None or monotonic() - created <= self.timeToLive):
+				self.results.move_to_end(key)
+				self.hits += 1
+				return self.copyOf(result)
+
+			del self.results[key]
+
+		self.misses += 1
+		result = searchFunction(graph, start, goal, *args, **kwargs)
+
+		self.results[key] = (weakref.ref(graph), graph.version, monotonic(), result)
+
+		# Evict the least recently used results
+		while len(self.results) > self.maxSize:
+			self.results.popitem(last = False)
+			self.evictions += 1
+
+		return self.copyOf(result)
+
+	def wrap(self, searchFunction):
+		"""
+		Return a function with the same arguments as searchFunction that answers through this cache, for example:
+			cachedSearch = cache.wrap(uniformCostSearch)
+			path, cost = cachedSearch(graph, start, goal)
+		"""
+
+		def cachedSearch(graph, start, goal, *args, **kwargs):
+			return self.search(searchFunction, graph, start, goal, *args, **kwargs)
+
+		return cachedSearch
+
+	def copyOf(self, result):
+		"""Copy the path of a (path, cost) result so callers can't change the cached one"""
+		return copyResult(result)
+
+	def clear(self):
+		"""Remove every result and reset the counters"""
+
+		self.results.clear()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def __len__(self):
+		return len(self.results)
+
+	def __str__(self):
+		return f"A search cache holding {len(self.results)} of {self.maxSize} results with {self.hits} hits and {self.misses} misses"
@@ -0,0 +1,87 @@
+# Per-query statistics shared by every search algorithm
+# Each search takes an optional stats argument, when it is None (the default) no statistics are recorded
+# The onExpand and onGenerate callbacks are only called when given, so they cost nothing otherwise
+# instrumentedSearch runs any search with a fresh SearchStats and returns a SearchResult holding the path, cost and statistics
+
+from Graphs import NoPathError
+from collections import namedtuple
+from time import perf_counter
+from math import inf
+
+# The result of an instrumented search, path is None and cost is inf if there is no path
+SearchResult = namedtuple('SearchResult', ['path', 'cost', 'stats'])
+
+class SearchStats():
+
+	def __init__(self, onExpand = None, onGenerate = None):
+		"""
+		Creates a new set of statistics, all starting at zero
+		onExpand(vertex) is called each time a vertex is expanded
+		onGenerate(vertex, parent) is called each time a vertex is added to the frontier
+		"""
+
+		self.onExpand = onExpand
+		self.onGenerate = onGenerate
+
+		self.nodesExpanded = 0
+		self.nodesGenerated = 0
+		self.peakFrontier = 0
+		self.reopenings = 0
+		self.heuristicCalls = 0
+		self.wallTime = 0.0
+
+		# Only used by the iterative deepening searches
+		self.iterations = 0
+		self.expandedPerIteration = []
+
+	def expand(self, vertex):
+		"""Record that a vertex is being expanded"""
+
+		self.nodesExpanded += 1
+		if self.onExpand is not None:
+			self.onExpand(vertex)
+
+	def generate(self, vertex, parent, frontierSize):
+		"""Record that a vertex was added to a frontier which now holds frontierSize vertices"""
+
+		self.nodesGenerated += 1
+		if frontierSize > self.peakFrontier:
+			self.peakFrontier = frontierSize
+		if self.onGenerate is not None:
+			self.onGenerate(vertex, parent)
+
+	def reopen(self, vertex, parent):
+		"""Record that a cheaper path was found to a vertex already generated"""
+
+		self.reopenings += 1
+		if self.onGenerate is not None:
+			self.onGenerate(vertex, parent)
+
+	def asDict(self):
+		"""The statistics as a dictionary, without the callbacks"""
+
+		return {name : value for name, value in vars(self).items() if name not in ['onExpand', 'onGenerate']}
+
+	def __str__(self):
+		return (f"{self.nodesExpanded} expanded, {self.nodesGenerated} generated, peak frontier {self.peakFrontier}, "
+				f"{self.reopenings} reopenings, {self.heuristicCalls} heuristic calls in {self.wallTime:.6f}s")
+
+def instrumentedSearch(searchFunction, graph, start, goal, *args, onExpand = None, onGenerate = None):
+	"""
+	Run searchFunction(graph, start, goal, *args) recording its statistics, for example:
+		result = instrumentedSearch(AStarSearch, graph, start, goal, heuristic)
+		print(result.path, result.cost, result.stats.nodesExpanded)
+	Returns a SearchResult, a search that finds no path gives a path of None and a cost of inf
+	"""
+
+	stats = SearchStats(onExpand, onGenerate)
+	began = perf_counter()
+
+	try:
+		path, cost = searchFunction(graph, start, goal, *args, stats = stats)
+	except NoPathError:
+		path, cost = None, inf
+	finally:
+		stats.wallTime = perf_counter() - began
+
+	return SearchResult(path, cost, stats)
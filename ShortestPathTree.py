@@ -0,0 +1,190 @@
+# Single source shortest path trees, grown once and then queried for any number of vertices
+# The tree is grown by uniform cost search (Dijkstra) from the source over the whole graph, or only out to a radius
+# The cost and parent of every vertex are stored in arrays indexed by vertex id, so a path to any vertex is rebuilt in O(path length)
+# Vertices are kept in the order they were reached, which is also increasing cost, so the vertices within any cost of the source
+# (an isochrone) are found with a binary search rather than another search of the graph
+# Works on a Graphs.Graph or a CompactGraph, using the CSR arrays of a CompactGraph directly
+
+from Graphs import Graph, NoPathError, loadGraph
+from CompactGraph import CompactGraph
+from PriorityQueue import IndexedPriorityQueue
+from array import array
+from bisect import bisect_right
+from math import inf
+
+class ShortestPathTree():
+
+	def __init__(self, source, names, ids, costs, parents, order, radius, reverse = False):
+		"""
+		Creates a tree from already computed arrays
+		costs[i] is the cost from the source to the vertex with id i, or inf if it wasn't reached, and parents[i] the id it was reached from, or -1
+		order holds the ids of the reached vertices in increasing cost
+		Use grow rather than calling this directly
+		"""
+
+		self.source = source
+		self.names = names
+		self.ids = ids
+		self.costs = costs
+		self.parents = parents
+		self.order = order
+		self.radius = radius
+		self.reverse = reverse
+
+		# The cost of each reached vertex in the order they were reached, for finding isochrones
+		self.orderCosts = array('d', (costs[i] for i in order))
+
+	@classmethod
+	def grow(cls, graph, source, radius = inf, reverse = False, stats = None):
+		"""
+		Grow the shortest path tree of a source vertex, reaching every vertex whose cost is at most radius
+		If reverse is True the edges are followed backwards, giving the cost from each vertex to the source instead
+		If a SearchStats is given the vertices expanded, generated and reopened are recorded in it
+		"""
+
+		# Get the ids of the vertices and a function giving the (id, weight) of each edge of a vertex id, in the direction being searched
+		if isinstance(graph, CompactGraph):
+			names, ids = graph.names, graph.ids
+			if reverse:
+				edgesOf = lambda i: zip(graph.reverseNeighbourIds(i), graph.reverseNeighbourWeights(i))
+			else:
+				edgesOf = lambda i: zip(graph.neighbourIds(i), graph.neighbourWeights(i))
+		else:
+			names = graph.vertices
+			ids = {name : i for i, name in enumerate(names)}
+			edgeDicts = graph.reverseDict if reverse else graph.graphDict
+			edgesOf = lambda i: ((ids[edge], weight) for edge, weight in edgeDicts[names[i]].items())
+
+		if source not in ids:
+			raise Exception("No such vertex")
+
+		costs = array('d', [inf]) * len(names)
+		parents = array('q', [-1]) * len(names)
+		explored = bytearray(len(names))
+		order = array('q')
+
+		sourceId = ids[source]
+		costs[sourceId] = 0
+		frontier = IndexedPriorityQueue()
+		frontier.push(sourceId, 0)
+
+		while len(frontier) > 0:
+
+			# Get the next vertex to explore and it's cost
+			i, cost = frontier.pop()
+
+			# Every vertex left costs more than the radius, so forget the costs found for them
+			if cost > radius:
+				for j in [i] + list(frontier.positions.keys()):
+					costs[j] = inf
+					parents[j] = -1
+				break
+
+			explored[i] = 1
+			order.append(i)
+
+			if stats is not None:
+				stats.expand(names[i])
+
+			for j, weight in edgesOf(i):
+
+				# If the vertex has not yet been explored and the edge is not a loop
+				if explored[j] or j == i:
+					continue
+
+				newCost = cost + weight
+
+				if newCost < costs[j]:
+
+					if j in frontier:
+						frontier.decreaseKey(j, newCost)
+						if stats is not None:
+							stats.reopen(names[j], names[i])
+					else:
+						frontier.push(j, newCost)
+						if stats is not None:
+							stats.generate(names[j], names[i], len(frontier))
+
+					costs[j] = newCost
+					parents[j] = i
+
+		return cls(source, names, ids, costs, parents, order, radius, reverse)
+
+	def costTo(self, vertex):
+		"""The cost of the cheapest path between the source and a vertex, inf if the tree doesn't reach it"""
+
+		try:
+			return self.costs[self.ids[vertex]]
+		except KeyError:
+			raise Exception("No such vertex")
+
+	def pathTo(self, vertex):
+		"""
+		The cheapest path from the source to a vertex, or from the vertex to the source if the tree was grown in reverse
+		Raises NoPathError if the tree doesn't reach the vertex
+		"""
+
+		if self.costTo(vertex) == inf:
+			raise NoPathError(f"No path exists between {self.source} and {vertex}")
+
+		path = [self.ids[vertex]]
+		while self.parents[path[-1]] >= 0:
+			path.append(self.parents[path[-1]])
+
+		if not self.reverse:
+			path.reverse()
+
+		return [self.names[i] for i in path]
+
+	def within(self, cost):
+		"""The vertices whose cheapest path from the source costs at most cost, in increasing cost"""
+
+		if cost > self.radius:
+			raise Exception(f"The tree only reaches vertices within {self.radius} of the source")
+
+		return [self.names[i] for i in self.order[:bisect_right(self.orderCosts, cost)]]
+
+	@property
+	def vertices(self):
+		"""Return a list of the vertices reached, in increasing cost"""
+		return [self.names[i] for i in self.order]
+
+	def __contains__(self, vertex):
+		return vertex in self.ids and self.costs[self.ids[vertex]] < inf
+
+	def __len__(self):
+		return len(self.order)
+
+	def __str__(self):
+		return f"A shortest path tree from {self.source} reaching {len(self.order)} of {len(self.names)} vertices"
+
+def isochrone(graph, source, cost, reverse = False):
+	"""The vertices whose cheapest path from the source, or to it if reverse is True, costs at most cost"""
+	return ShortestPathTree.grow(graph, source, cost, reverse).vertices
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Source vertex?")
+	source = input("")
+	print("Limit the cost of the paths? enter 0 for no limit")
+	radius = float(input(""))
+	if radius == 0:
+		radius = inf
+
+	tree = ShortestPathTree.grow(graph, source, radius)
+	print(tree)
+
+	# Answer queries from the same tree
+	while True:
+
+		print("Vertex to find the path to? enter nothing to stop")
+		vertex = input("")
+		if vertex == "":
+			break
+
+		if vertex in tree:
+			print(tree.pathTo(vertex), tree.costTo(vertex))
+		else:
+			print(f"{vertex} is not reached")
@@ -0,0 +1,150 @@
+# A k-d tree over the coordinates of the vertices of a graph, used to snap arbitrary points to their nearest vertices
+# The tree is stored implicitly: the vertex at the middle of each range of the ordered points splits the range in two,
+# along the x axis at even depths and the y axis at odd depths
+# Queries descend to the side of each split containing the point first, and only search the other side if it could hold a closer vertex
+# For (latitude, longitude) coordinates the points are placed on the unit sphere, where the straight line (chord) distance
+# orders vertices the same way as the great circle distance
+
+from Graphs import Graph, loadGraph
+from GeometricHeuristics import EARTH_RADIUS
+from math import radians, sin, cos, asin, sqrt
+import heapq
+
+class SpatialIndex():
+
+	def __init__(self, vertices, points, metric = "EUCLIDEAN"):
+		"""
+		Creates an index of the vertices at the given points, vertices[i] being at points[i]
+		metric is "EUCLIDEAN" for (x, y) points, or "HAVERSINE" for (latitude, longitude) points in degrees
+		"""
+
+		if metric not in ["EUCLIDEAN", "HAVERSINE"]:
+			raise Exception(f"Unknown distance metric {metric}")
+
+		if len(vertices) != len(points):
+			raise Exception("There must be exactly one point per vertex")
+
+		self.metric = metric
+
+		# Latitudes and longitudes are placed on the unit sphere
+		if metric == "HAVERSINE":
+			points = [self.onSphere(point) for point in points]
+		else:
+			points = [tuple(point) for point in points]
+
+		self.dimensions = len(points[0]) if len(points) > 0 else 2
+
+		# Order the points so the middle of every range splits it, building the tree without recursion
+		order = list(range(len(points)))
+		ranges = [(0, len(order), 0)]
+
+		while len(ranges) > 0:
+
+			low, high, depth = ranges.pop()
+			if high - low <= 1:
+				continue
+
+			axis = depth % self.dimensions
+			order[low:high] = sorted(order[low:high], key = lambda i: points[i][axis])
+
+			middle = (low + high) // 2
+			ranges.append((low, middle, depth + 1))
+			ranges.append((middle + 1, high, depth + 1))
+
+		self.vertices = [vertices[i] for i in order]
+		self.points = [points[i] for i in order]
+
+	@classmethod
+	def fromGraph(cls, graph, metric = "EUCLIDEAN"):
+		"""Index every vertex of a graph that has coordinates"""
+
+		coordinates = graph.coordinates
+		return cls(list(coordinates.keys()), list(coordinates.values()), metric)
+
+	@staticmethod
+	def onSphere(point):
+		"""The position on the unit sphere of a (latitude, longitude) point in degrees"""
+
+		latitude, longitude = radians(point[0]), radians(point[1])
+		return (cos(latitude) * cos(longitude), cos(latitude) * sin(longitude), sin(latitude))
+
+	def distanceOf(self, squaredDistance):
+		"""Convert the squared distance between two indexed points into the distance of the metric"""
+
+		if self.metric == "HAVERSINE":
+			# The chord between two points on the unit sphere subtends an angle of 2 * asin(chord / 2)
+			return 2 * EARTH_RADIUS * asin(min(1.0, sqrt(squaredDistance) / 2))
+
+		return sqrt(squaredDistance)
+
+	def nearest(self, point):
+		"""The vertex nearest to a point"""
+
+		nearest = self.nearestK(point, 1)
+
+		if len(nearest) == 0:
+			raise Exception("The index holds no vertices")
+
+		return nearest[0][0]
+
+	def nearestK(self, point, k):
+		"""The k vertices nearest to a point as (vertex, distance) tuples, nearest first"""
+
+		query = self.onSphere(point) if self.metric == "HAVERSINE" else tuple(point)
+		points = self.points
+		dimensions = self.dimensions
+
+		# A heap of the k nearest points found so far, the farthest of them on top
+		best = []
+
+		def search(low, high, depth):
+
+			if low >= high:
+				return
+
+			middle = (low + high) // 2
+			splitter = points[middle]
+			squaredDistance = sum((q - s) ** 2 for q, s in zip(query, splitter))
+
+			if len(best) < k:
+				heapq.heappush(best, (-squaredDistance, middle))
+			elif squaredDistance < -best[0][0]:
+				heapq.heapreplace(best, (-squaredDistance, middle))
+
+			# Search the side of the split holding the point first
+			difference = query[depth % dimensions] - splitter[depth % dimensions]
+			if difference < 0:
+				near, far = (low, middle), (middle + 1, high)
+			else:
+				near, far = (middle + 1, high), (low, middle)
+
+			search(near[0], near[1], depth + 1)
+
+			# The other side can only hold a closer point if the split itself is closer than the farthest point kept
+			if len(best) < k or difference ** 2 < -best[0][0]:
+				search(far[0], far[1], depth + 1)
+
+		if k > 0:
+			search(0, len(points), 0)
+
+		return [(self.vertices[i], self.distanceOf(-negativeDistance)) for negativeDistance, i in sorted(best, reverse = True)]
+
+	def __len__(self):
+		return len(self.vertices)
+
+	def __str__(self):
+		return f"A spatial index of {len(self.vertices)} vertices"
+
+if __name__ == '__main__':
+
+	graph = loadGraph()
+
+	print("Distance metric? (EUCLIDEAN/HAVERSINE)")
+	metric = input("")
+	index = SpatialIndex.fromGraph(graph, metric)
+	print(index)
+
+	print("Point to snap? as x,y or latitude,longitude")
+	point = tuple(float(value) for value in input("").split(","))
+
+	print(index.nearestK(point, 5))
@@ -1,30 +1,57 @@
 # Implementation of the uniform cost search (UCS) algorithm 
-# The frontier is ordered so that the vertex with the lowest path cost is searched first
+# The frontier is a priority queue ordered so that the vertex with the lowest path cost is searched first
 # Takes in a graph, start vertex and goal vertex and finds a path from the start vertex to the goal vertex
 # Returns the path and cost
+# multiUniformCostSearch searches from many sources at once and stops at the first goal explored, the cheapest of any source to any goal
 
-from Graphs import Graph, loadGraph
+from Graphs import Graph, NoPathError, MultiSearchResult, loadGraph, reconstructPath
+from PriorityQueue import IndexedPriorityQueue
 
-def uniformCostSearch(graph, start, goal):
+def uniformCostSearch(graph, start, goal, stats = None):
+	"""
+	Given a graph, start node and goal node, this function returns the cheapest path and its cost
+	If a SearchStats is given the vertices expanded and generated are recorded in it
+	"""
 
-	frontier = [(start, 0)]
-	explored = []
-	paths = {start : [start]}
+	costs, parents = uniformCostTree(graph, start, [goal], stats = stats)
 
-	# While the frontier is not empty, until the goal is reached
-	while True:
+	if goal not in costs:
+		raise NoPathError(f"No path from {start} to {goal}")
 
+	return reconstructPath(parents, goal), costs[goal]
 
-		if len(frontier) == 0:
-			raise Exception(f"No path from {start} to {goal}")
+def multiUniformCostSearch(graph, sources, goals, stats = None):
+	"""
+	Given a graph, a list of sources and a list of goals, this function returns the cheapest path from any source to any goal
+	as a MultiSearchResult of the path, its cost and the source and goal it joins
+	If a SearchStats is given the vertices expanded, generated and reopened are recorded in it
+	"""
 
-		frontier.sort(key=lambda tup: tup[1], reverse = False)
+	goals = set(goals)
+
+	# Every source starts in the frontier with a cost of 0
+	frontier = IndexedPriorityQueue()
+	parents = {}
+	for source in sources:
+		if source not in frontier:
+			frontier.push(source, 0)
+			parents[source] = None
+
+	explored = set()
+
+	# While the frontier is not empty, until the first goal is reached
+	while len(frontier) > 0:
 
 		# Get the next vertex to explore and it's cost
-		vertex, cost = frontier.pop(0)
+		vertex, cost = frontier.pop()
+
+		# The first goal explored is the cheapest to reach from any source
+		if vertex in goals:
+			path = reconstructPath(parents, vertex)
+			return MultiSearchResult(path, cost, path[0], vertex)
 
-		if vertex == goal:
-			return paths[vertex], cost
+		if stats is not None:
+			stats.expand(vertex)
 
 		# For each edge of the vertex
 		for child in graph.edgesOf(vertex):
@@ -32,29 +59,94 @@ def uniformCostSearch(graph, start, goal):
 			# If the vertex has not yet been explored and the edge is not a loop
 			if child != vertex and child not in explored:
 
+				newChildValue = cost + graph.edgeWeight(vertex, child)
+
 				# If the child is in the frontier check if there is a cheaper path to it
-				if child in [f[0] for f in frontier]:				
+				if child in frontier:
 
-					oldChildValue = dict(frontier)[child]
-					newChildValue = cost + graph.edgeWeight(vertex, child)
+					if newChildValue < frontier[child]:
 
-					# If the new cost is less than the current cost replace the child vertex in the frontier
-					if newChildValue < oldChildValue:
+						frontier.decreaseKey(child, newChildValue)
+						parents[child] = vertex
 
-						frontier.remove((child, oldChildValue))
-						frontier.append((child, newChildValue))
-						paths[child] = paths[vertex] + [child]
+						if stats is not None:
+							stats.reopen(child, vertex)
 
 				else:
 
-					# Add the child vertex to the frontier and store its path
-					frontier.append((child, cost + graph.edgeWeight(vertex, child)))
-					paths[child] = paths[vertex] + [child]
+					# Add the child vertex to the frontier and store its parent
+					frontier.push(child, newChildValue)
+					parents[child] = vertex
+
+					if stats is not None:
+						stats.generate(child, vertex, len(frontier))
+
+		explored.add(vertex)
+
+	raise NoPathError(f"No path from any of {list(sources)} to any of {list(goals)}")
+
+def uniformCostTree(graph, start, goals = None, reverse = False, stats = None):
+	"""
+	Search outwards from the start vertex until every one of the goals has been explored, or until the whole graph has if goals is None
+	If reverse is True the edges are followed backwards, giving the cost from each vertex to the start instead
+	If a SearchStats is given the vertices expanded, generated and reopened are recorded in it
+	Returns the cost of each explored vertex and the parent pointers of the search tree, paths are rebuilt with reconstructPath
+	"""
+
+	frontier = IndexedPriorityQueue()
+	frontier.push(start, 0)
+	explored = set()
+	parents = {start : None}
+	costs = {}
+	remaining = set(goals) if goals is not None else None
+
+	# While the frontier is not empty, until every goal is reached
+	while len(frontier) > 0:
+
+		# Get the next vertex to explore and it's cost
+		vertex, cost = frontier.pop()
+		costs[vertex] = cost
+
+		if remaining is not None:
+			remaining.discard(vertex)
+			if len(remaining) == 0:
+				break
+
+		if stats is not None:
+			stats.expand(vertex)
+
+		# For each edge of the vertex, in the direction being searched
+		for child in (graph.reverseEdgesOf(vertex) if reverse else graph.edgesOf(vertex)):
+
+			# If the vertex has not yet been explored and the edge is not a loop
+			if child != vertex and child not in explored:
+
+				newChildValue = cost + (graph.edgeWeight(child, vertex) if reverse else graph.edgeWeight(vertex, child))
+
+				# If the child is in the frontier check if there is a cheaper path to it
+				if child in frontier:
+
+					# If the new cost is less than the current cost lower the child's cost in the frontier
+					if newChildValue < frontier[child]:
+
+						frontier.decreaseKey(child, newChildValue)
+						parents[child] = vertex
+
+						if stats is not None:
+							stats.reopen(child, vertex)
+
+				else:
 
-		explored.append(vertex)
+					# Add the child vertex to the frontier and store its parent
+					frontier.push(child, newChildValue)
+					parents[child] = vertex
 
+					if stats is not None:
+						stats.generate(child, vertex, len(frontier))
 
+		explored.add(vertex)
 
+	return costs, parents
 
 if __name__ == '__main__':
 